@@ -9,14 +9,21 @@ This package provides a LangGraph-based multi-agent workflow:
 
 __version__ = "0.2.0"
 
-from .config import Settings, get_settings
-from .graph import (
-    create_comprehension_graph,
-    run_comprehension_workflow,
-    run_comprehension_workflow_sync,
-    stream_comprehension_workflow,
-)
-from .llm import get_architect_llm, get_code_ingestion_llm, get_llm
+from importlib import import_module
+
+# Public names resolved on first access, so importing a submodule such as
+# src.main does not pull in langgraph and the LLM provider SDKs up front.
+_LAZY_EXPORTS = {
+    "Settings": ".config",
+    "get_settings": ".config",
+    "get_llm": ".llm",
+    "get_code_ingestion_llm": ".llm",
+    "get_architect_llm": ".llm",
+    "create_comprehension_graph": ".graph",
+    "run_comprehension_workflow": ".graph",
+    "run_comprehension_workflow_sync": ".graph",
+    "stream_comprehension_workflow": ".graph",
+}
 
 __all__ = [
     # Configuration
@@ -32,3 +39,11 @@ __all__ = [
     "run_comprehension_workflow_sync",
     "stream_comprehension_workflow",
 ]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -418,8 +418,8 @@ async def architect_node(state: AgentState) -> dict:
                         description=opt.get("description", ""),
                         pros=opt.get("pros", []),
                         cons=opt.get("cons", []),
-                        effort=EffortBand(opt.get("effort", "M")),
-                        risk_level=RiskSeverity(opt.get("risk_level", "medium")),
+                        effort=EffortBand.from_str(opt.get("effort", "M")),
+                        risk_level=RiskSeverity.from_str(opt.get("risk_level", "medium")),
                         recommended=opt.get("recommended", False),
                     )
                     for i, opt in enumerate(biz_data.get("options", []))
@@ -484,11 +484,11 @@ async def architect_node(state: AgentState) -> dict:
                     RiskItem(
                         id=r.get("id", f"RISK-{i:03d}"),
                         category=r.get("category", "tech_debt"),
-                        severity=RiskSeverity(r.get("severity", "medium")),
+                        severity=RiskSeverity.from_str(r.get("severity", "medium")),
                         title=r.get("title", ""),
                         description=r.get("description", ""),
                         remediation=r.get("remediation"),
-                        effort=EffortBand(r.get("effort", "M")) if r.get("effort") else None,
+                        effort=EffortBand.from_str(r.get("effort", "M")) if r.get("effort") else None,
                     )
                     for i, r in enumerate(tech_data.get("risk_register", []))
                 ],
@@ -510,7 +510,7 @@ async def architect_node(state: AgentState) -> dict:
                         id=b.get("id", f"STORY-{i:03d}"),
                         title=b.get("title", ""),
                         description=b.get("description", ""),
-                        effort=EffortBand(b.get("effort", "M")),
+                        effort=EffortBand.from_str(b.get("effort", "M")),
                         linked_risk_id=b.get("linked_risk_id"),
                         sprint=b.get("sprint", 1),
                     )
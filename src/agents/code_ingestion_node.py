@@ -10,6 +10,7 @@ Implements the Code Ingestion Agent prompt as a LangGraph node.
 
 import asyncio
 import json
+from collections import Counter
 from datetime import datetime
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
@@ -216,7 +217,7 @@ async def code_ingestion_node(state: AgentState) -> dict:
             # Get repository
             logger.info("fetching_repository")
             try:
-                repo = github.get_repository(state.repo_url)
+                repo = await github.get_repository_async(state.repo_url)
                 logger.info("repository_found", repo_name=repo.full_name)
             except Exception as e:
                 logger.error("github_error", error=str(e))
@@ -228,6 +229,16 @@ async def code_ingestion_node(state: AgentState) -> dict:
             files: list[FileInfo] = []
             code_files, config_files, doc_files = [], [], []
             iac_files, cicd_files, test_files = [], [], []
+            # Path bucket per classification, filled in the discovery pass
+            buckets = {
+                "code": code_files,
+                "config": config_files,
+                "docs": doc_files,
+                "iac": iac_files,
+                "cicd": cicd_files,
+                "tests": test_files,
+            }
+            language_counts: Counter[str] = Counter()
             
             total_size = 0
             excluded_count = 0
@@ -242,19 +253,12 @@ async def code_ingestion_node(state: AgentState) -> dict:
                     files.append(file_info)
                     total_size += file_info.size_bytes
                     
-                    # Classify into buckets
-                    if file_info.classification == "code":
-                        code_files.append(file_info.path)
-                    elif file_info.classification == "config":
-                        config_files.append(file_info.path)
-                    elif file_info.classification == "docs":
-                        doc_files.append(file_info.path)
-                    elif file_info.classification == "iac":
-                        iac_files.append(file_info.path)
-                    elif file_info.classification == "cicd":
-                        cicd_files.append(file_info.path)
-                    elif file_info.classification == "tests":
-                        test_files.append(file_info.path)
+                    # Classify into buckets and count languages in the same pass
+                    bucket = buckets.get(file_info.classification)
+                    if bucket is not None:
+                        bucket.append(file_info.path)
+                    if file_info.language:
+                        language_counts[file_info.language] += 1
                 
                 tracker.add_metadata(files_found=len(files), total_size_bytes=total_size)
             
@@ -267,14 +271,9 @@ async def code_ingestion_node(state: AgentState) -> dict:
             logger.info("dependencies_found", count=len(dependencies))
             
             # Build summaries for LLM analysis
-            language_counts: dict[str, int] = {}
-            for f in files:
-                if f.language:
-                    language_counts[f.language] = language_counts.get(f.language, 0) + 1
-            
             file_summary = "\n".join([
                 f"- {lang}: {count} files"
-                for lang, count in sorted(language_counts.items(), key=lambda x: -x[1])[:10]
+                for lang, count in language_counts.most_common(10)
             ])
             
             dependency_summary = "\n".join([
@@ -321,7 +320,7 @@ async def code_ingestion_node(state: AgentState) -> dict:
                 RiskItem(
                     id=r.get("id", f"RISK-{i:03d}"),
                     category=r.get("category", "tech_debt"),
-                    severity=RiskSeverity(r.get("severity", "medium")),
+                    severity=RiskSeverity.from_str(r.get("severity", "medium")),
                     title=r.get("title", "Unknown risk"),
                     description=r.get("description", ""),
                     remediation=r.get("remediation"),
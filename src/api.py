@@ -7,18 +7,22 @@ Includes production-grade logging, error handling, and observability.
 """
 
 import asyncio
+import json
 import time
 import uuid
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
+from pathlib import Path
 from typing import Any
 
-from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, Response
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel, Field
 
+from src import __version__
+from src.config import get_settings
 from src.graph import create_comprehension_graph, stream_comprehension_workflow
 from src.observability import (
     CodeComprehensionError,
@@ -27,6 +31,7 @@ from src.observability import (
     PerformanceTracker,
     get_correlation_id,
     get_logger,
+    init_default_logging,
     metrics,
     new_correlation_id,
     set_correlation_id,
@@ -34,14 +39,29 @@ from src.observability import (
 from src.schemas import (
     AgentState,
     BusinessContext,
+    BusinessReport,
     IngestionPolicy,
     IngestionStatus,
+    RepoBundle,
     TargetArchitecture,
+    TechnicalReport,
 )
 
+try:
+    # Parses persisted results several times faster than the stdlib
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
+
 # Initialize logger
 logger = get_logger(__name__)
 
+# Agents exposed by the workflow graph
+AGENTS = ["code_ingestion", "architect"]
+
+# Max characters of each agent message kept in job progress
+PROGRESS_MESSAGE_MAX_CHARS = 500
+
 
 # =============================================================================
 # MODELS
@@ -116,6 +136,110 @@ class ErrorResponse(BaseModel):
 jobs: dict[str, dict[str, Any]] = {}
 
 
+def create_job(request: ComprehensionRequest, status: JobStatus) -> str:
+    """Register a new job record and return its ID."""
+    job_id = str(uuid.uuid4())
+    jobs[job_id] = {
+        "status": status,
+        "request": request.model_dump(),
+        "created_at": datetime.utcnow(),
+        "completed_at": None,
+        "progress": None,
+        "result": None,
+        "error": None,
+        "correlation_id": get_correlation_id(),
+    }
+    return job_id
+
+
+# Persisted results (and their jobs) are kept for a day, then pruned
+RESULT_TTL_SECONDS = 24 * 60 * 60
+RESULT_PRUNE_INTERVAL_SECONDS = 60 * 60
+
+
+def get_results_dir() -> Path:
+    """Directory holding persisted job result payloads."""
+    return Path(get_settings().output_dir) / "jobs"
+
+
+def get_result_path(job_id: str) -> Path:
+    """Path of the persisted result payload for a job."""
+    return get_results_dir() / f"{job_id}.json"
+
+
+def prune_expired_results(max_age_seconds: float = RESULT_TTL_SECONDS) -> list[str]:
+    """Delete result payloads older than max_age_seconds; return their job IDs."""
+    results_dir = get_results_dir()
+    if not results_dir.is_dir():
+        return []
+    
+    cutoff = time.time() - max_age_seconds
+    removed = []
+    for result_path in results_dir.glob("*.json"):
+        try:
+            if result_path.stat().st_mtime < cutoff:
+                result_path.unlink()
+                removed.append(result_path.stem)
+        except FileNotFoundError:
+            continue  # Deleted concurrently (e.g. DELETE /analyze/{job_id})
+    
+    if removed:
+        logger.info("expired_results_pruned", removed=len(removed))
+    return removed
+
+
+async def expire_jobs(max_age_seconds: float = RESULT_TTL_SECONDS) -> int:
+    """
+    Drop jobs whose results have expired; return how many were dropped.
+    
+    A job expires when its result payload is pruned, or when it finished
+    (completed or failed) more than max_age_seconds ago. The jobs store is
+    only touched here, on the event loop; file deletion runs in a thread.
+    """
+    expired = set(await asyncio.to_thread(prune_expired_results, max_age_seconds))
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    expired.update(
+        job_id for job_id, job in jobs.items()
+        if job["completed_at"] is not None and job["completed_at"] < cutoff
+    )
+    dropped = 0
+    for job_id in expired:
+        if jobs.pop(job_id, None) is not None:
+            dropped += 1
+    
+    if dropped:
+        logger.info("expired_jobs_dropped", dropped=dropped)
+    return dropped
+
+
+async def expire_jobs_periodically(
+    interval_seconds: float = RESULT_PRUNE_INTERVAL_SECONDS,
+) -> None:
+    """Expire old jobs and result payloads now and then every interval_seconds."""
+    while True:
+        try:
+            await expire_jobs()
+        except OSError as e:
+            logger.warning("result_prune_failed", error=str(e))
+        await asyncio.sleep(interval_seconds)
+
+
+def persist_result(job_id: str, result: dict[str, Any]) -> dict[str, Any]:
+    """
+    Write a job result to disk and return the summary kept in memory.
+    
+    Completed results are not held in the jobs store; clients fetch the
+    full payload from GET /analyze/{job_id}/result.
+    """
+    result_path = get_result_path(job_id)
+    result_path.parent.mkdir(parents=True, exist_ok=True)
+    result_path.write_text(json.dumps(result, default=str), encoding="utf-8")
+    return {
+        "summary_keys": list(result),
+        "result_url": f"/analyze/{job_id}/result",
+    }
+
+
 # =============================================================================
 # EXCEPTION HANDLERS
 # =============================================================================
@@ -177,16 +301,19 @@ async def generic_exception_handler(
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
-    logger.info("api_starting", version="0.2.0", agents=["code_ingestion", "architect"])
+    init_default_logging()
+    logger.info("api_starting", version=__version__, agents=AGENTS)
+    prune_task = asyncio.create_task(expire_jobs_periodically())
     yield
     # Shutdown
+    prune_task.cancel()
     logger.info("api_shutdown")
 
 
 app = FastAPI(
     title="Code Comprehension API",
     description="REST API for multi-agent code comprehension using LangGraph",
-    version="0.2.0",
+    version=__version__,
     lifespan=lifespan,
 )
 
@@ -260,6 +387,60 @@ async def correlation_id_middleware(request: Request, call_next):
     return response
 
 
+# =============================================================================
+# RESULT SUMMARIES
+# =============================================================================
+
+def preview_content(content: Any, limit: int = PROGRESS_MESSAGE_MAX_CHARS) -> str:
+    """Bound a message content for progress reporting, copying only when needed."""
+    if not isinstance(content, str):
+        content = str(content)
+    if len(content) > limit:
+        return content[:limit]
+    return content
+
+
+def summarize_repo_bundle(bundle: RepoBundle) -> dict[str, Any]:
+    """Summarize the ingestion bundle for the job result."""
+    return {
+        "repo_url": bundle.repo_url,
+        "ref": bundle.ref,
+        "languages": bundle.languages,
+        "frameworks": bundle.frameworks,
+        "total_files": bundle.total_files,
+        "dependencies_count": len(bundle.dependencies),
+        "risks_count": len(bundle.risks),
+    }
+
+
+def summarize_business_report(report: BusinessReport) -> dict[str, Any]:
+    """Summarize the business report for the job result."""
+    return {
+        "executive_summary": report.executive_summary,
+        "options_count": len(report.options),
+        "diagram": report.diagram_mermaid,
+    }
+
+
+def summarize_technical_report(report: TechnicalReport) -> dict[str, Any]:
+    """Summarize the technical report for the job result."""
+    return {
+        "codebase_map": report.codebase_map[:500] if report.codebase_map else None,
+        "risks_count": len(report.risk_register),
+        "migration_waves": len(report.migration_plan),
+        "backlog_items": len(report.backlog_slice),
+        "diagram": report.architecture_diagram_mermaid,
+    }
+
+
+# State key -> summarizer, in result order
+RESULT_SUMMARIZERS = {
+    "repo_bundle": summarize_repo_bundle,
+    "business_report": summarize_business_report,
+    "technical_report": summarize_technical_report,
+}
+
+
 # =============================================================================
 # BACKGROUND TASK
 # =============================================================================
@@ -311,60 +492,39 @@ async def run_comprehension_job(job_id: str, request: ComprehensionRequest):
                 graph = create_comprehension_graph()
                 config = {"configurable": {"thread_id": job_id}}
                 
-                final_state = None
+                final_state: dict[str, Any] = {}
                 async for event in graph.astream(initial_state, config):
                     for node_name, state_update in event.items():
                         jobs[job_id]["progress"]["current_agent"] = node_name
                         logger.info("agent_progress", agent=node_name)
                         
                         if "messages" in state_update:
+                            progress_messages = jobs[job_id]["progress"]["messages"]
                             for msg in state_update.get("messages", []):
                                 if hasattr(msg, "content"):
-                                    jobs[job_id]["progress"]["messages"].append({
+                                    progress_messages.append({
                                         "agent": node_name,
-                                        "content": msg.content[:500],
+                                        "content": preview_content(msg.content),
                                     })
-                        final_state = state_update
+                        final_state.update(state_update)
                 
                 # Extract results
-                result = {}
-                if final_state:
-                    if hasattr(final_state, "repo_bundle") and final_state.repo_bundle:
-                        bundle = final_state.repo_bundle
-                        result["repo_bundle"] = {
-                            "repo_url": bundle.repo_url,
-                            "ref": bundle.ref,
-                            "languages": bundle.languages,
-                            "frameworks": bundle.frameworks,
-                            "total_files": bundle.total_files,
-                            "dependencies_count": len(bundle.dependencies),
-                            "risks_count": len(bundle.risks),
-                        }
-                        tracker.add_metadata(
-                            files_processed=bundle.total_files,
-                            risks_found=len(bundle.risks),
-                        )
-                    
-                    if hasattr(final_state, "business_report") and final_state.business_report:
-                        report = final_state.business_report
-                        result["business_report"] = {
-                            "executive_summary": report.executive_summary,
-                            "options_count": len(report.options),
-                            "diagram": report.diagram_mermaid,
-                        }
-                    
-                    if hasattr(final_state, "technical_report") and final_state.technical_report:
-                        report = final_state.technical_report
-                        result["technical_report"] = {
-                            "codebase_map": report.codebase_map[:500] if report.codebase_map else None,
-                            "risks_count": len(report.risk_register),
-                            "migration_waves": len(report.migration_plan),
-                            "backlog_items": len(report.backlog_slice),
-                            "diagram": report.architecture_diagram_mermaid,
-                        }
+                result = {
+                    key: summarize(final_state[key])
+                    for key, summarize in RESULT_SUMMARIZERS.items()
+                    if final_state.get(key)
+                }
+                bundle = final_state.get("repo_bundle")
+                if bundle:
+                    tracker.add_metadata(
+                        files_processed=bundle.total_files,
+                        risks_found=len(bundle.risks),
+                    )
                 
+                # Large results are serialized and written off the event loop
+                result_summary = await asyncio.to_thread(persist_result, job_id, result)
                 jobs[job_id]["status"] = JobStatus.COMPLETED
-                jobs[job_id]["result"] = result
+                jobs[job_id]["result"] = result_summary
                 jobs[job_id]["completed_at"] = datetime.utcnow()
                 
                 logger.info("job_completed", result_summary=list(result.keys()))
@@ -387,8 +547,8 @@ async def health_check():
     """Health check endpoint."""
     return HealthResponse(
         status="healthy",
-        version="0.2.0",
-        agents=["code_ingestion", "architect"],
+        version=__version__,
+        agents=AGENTS,
     )
 
 
@@ -412,8 +572,6 @@ async def start_analysis(
     
     Returns a job ID to track progress.
     """
-    job_id = str(uuid.uuid4())
-    
     logger.info(
         "analysis_requested",
         repo_url=request.repo_url,
@@ -421,16 +579,7 @@ async def start_analysis(
         include_tests=request.include_tests,
     )
     
-    jobs[job_id] = {
-        "status": JobStatus.PENDING,
-        "request": request.model_dump(),
-        "created_at": datetime.utcnow(),
-        "completed_at": None,
-        "progress": None,
-        "result": None,
-        "error": None,
-        "correlation_id": get_correlation_id(),
-    }
+    job_id = create_job(request, JobStatus.PENDING)
     
     # Run in background
     background_tasks.add_task(run_comprehension_job, job_id, request)
@@ -464,6 +613,20 @@ async def get_analysis_status(job_id: str):
     )
 
 
+@app.get("/analyze/{job_id}/result", tags=["Analysis"])
+async def get_analysis_result(job_id: str):
+    """Stream the full result payload of a completed job."""
+    if job_id not in jobs:
+        logger.warning("job_not_found", job_id=job_id)
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    result_path = get_result_path(job_id)
+    if jobs[job_id]["status"] != JobStatus.COMPLETED or not result_path.exists():
+        raise HTTPException(status_code=409, detail="Job result not available")
+    
+    return FileResponse(result_path, media_type="application/json")
+
+
 @app.get("/jobs", tags=["Analysis"])
 async def list_jobs():
     """List all analysis jobs."""
@@ -487,6 +650,7 @@ async def delete_job(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
     
     del jobs[job_id]
+    get_result_path(job_id).unlink(missing_ok=True)
     logger.info("job_deleted", job_id=job_id)
     return {"message": f"Job {job_id} deleted"}
 
@@ -503,20 +667,13 @@ async def analyze_sync(request: ComprehensionRequest):
     ⚠️ Warning: This may timeout for large repositories.
     Use the async /analyze endpoint for large repos.
     """
-    job_id = str(uuid.uuid4())
-    
     logger.info(
         "sync_analysis_requested",
         repo_url=request.repo_url,
         ref=request.ref,
     )
     
-    jobs[job_id] = {
-        "status": JobStatus.RUNNING,
-        "request": request.model_dump(),
-        "created_at": datetime.utcnow(),
-        "correlation_id": get_correlation_id(),
-    }
+    job_id = create_job(request, JobStatus.RUNNING)
     
     # Run synchronously
     await run_comprehension_job(job_id, request)
@@ -526,10 +683,11 @@ async def analyze_sync(request: ComprehensionRequest):
         logger.error("sync_analysis_failed", job_id=job_id, error=job.get("error"))
         raise HTTPException(status_code=500, detail=job.get("error", "Unknown error"))
     
+    payload = await asyncio.to_thread(get_result_path(job_id).read_bytes)
     return {
         "job_id": job_id,
         "status": job["status"],
-        "result": job.get("result"),
+        "result": json_loads(payload),
     }
 
 
@@ -7,20 +7,21 @@ Uses Pydantic Settings for type-safe configuration management.
 
 import os
 from functools import lru_cache
-from typing import Literal
+from typing import Any, Literal
 
-from pydantic import Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic_settings import (
+    BaseSettings,
+    EnvSettingsSource,
+    PydanticBaseSettingsSource,
+    SettingsConfigDict,
+)
 
 
-class LLMSettings(BaseSettings):
+class LLMSettings(BaseModel):
     """LLM provider configuration."""
     
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
+    model_config = ConfigDict(frozen=True)
     
     # LLM Provider: "openai", "azure_openai", "anthropic"
     llm_provider: Literal["openai", "azure_openai", "anthropic"] = Field(
@@ -47,14 +48,10 @@ class LLMSettings(BaseSettings):
     max_tokens: int = Field(default=4096, description="Max tokens for LLM response")
 
 
-class GitHubSettings(BaseSettings):
+class GitHubSettings(BaseModel):
     """GitHub API configuration."""
     
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
+    model_config = ConfigDict(frozen=True)
     
     github_token: str | None = Field(default=None, description="GitHub API token")
     github_api_base_url: str = Field(
@@ -63,14 +60,10 @@ class GitHubSettings(BaseSettings):
     )
 
 
-class AgentSettings(BaseSettings):
+class AgentSettings(BaseModel):
     """Agent server configuration."""
     
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
+    model_config = ConfigDict(frozen=True)
     
     code_ingestion_agent_port: int = Field(default=5001, description="Code Ingestion Agent port")
     architect_agent_port: int = Field(default=5002, description="Architect Agent port")
@@ -81,13 +74,56 @@ class AgentSettings(BaseSettings):
     langchain_project: str = Field(default="code-comprehension", description="LangSmith project name")
 
 
+class FlatSectionSettingsSource(PydanticBaseSettingsSource):
+    """
+    Fill the nested sections from flat variable names (e.g. OPENAI_API_KEY).
+    
+    Reuses the variables already loaded by the environment and .env sources,
+    so the environment and .env file are only read once per Settings().
+    Nested names (e.g. LLM__OPENAI_API_KEY) take precedence.
+    """
+    
+    def __init__(
+        self,
+        settings_cls: type[BaseSettings],
+        *sources: EnvSettingsSource,
+    ):
+        super().__init__(settings_cls)
+        self.sources = sources
+    
+    def get_field_value(self, field, field_name):
+        return None, field_name, False
+    
+    def __call__(self) -> dict[str, Any]:
+        # Earlier sources win, so apply them last
+        env_vars: dict[str, str | None] = {}
+        for source in reversed(self.sources):
+            env_vars.update(source.env_vars)
+        
+        data: dict[str, Any] = {}
+        for section, field in self.settings_cls.model_fields.items():
+            model = field.annotation
+            if not (isinstance(model, type) and issubclass(model, BaseModel)):
+                continue
+            values = {
+                name: env_vars[name]
+                for name in model.model_fields
+                if env_vars.get(name) is not None
+            }
+            if values:
+                data[section] = values
+        return data
+
+
 class Settings(BaseSettings):
     """Main application settings combining all configuration."""
     
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
+        env_nested_delimiter="__",
         extra="ignore",
+        frozen=True,
     )
     
     # Sub-configurations
@@ -100,6 +136,23 @@ class Settings(BaseSettings):
     
     # Output directory for generated reports
     output_dir: str = Field(default="output", description="Directory for generated outputs")
+    
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        return (
+            init_settings,
+            env_settings,
+            dotenv_settings,
+            FlatSectionSettingsSource(settings_cls, env_settings, dotenv_settings),
+            file_secret_settings,
+        )
 
 
 @lru_cache
@@ -108,5 +161,9 @@ def get_settings() -> Settings:
     return Settings()
 
 
-# Export for convenience
-settings = get_settings()
+def __getattr__(name: str):
+    # `settings` is kept for convenience but resolved on first access, so
+    # importing this module does not parse the environment and .env file.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
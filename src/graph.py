@@ -9,122 +9,169 @@ The graph uses LangGraph's StateGraph to manage state transitions
 and supports checkpointing for fault tolerance.
 """
 
+import asyncio
 import os
-from typing import Literal
+import threading
+import weakref
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Literal
 
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command, Durability
 
 from src.agents import architect_node, code_ingestion_node
-from src.observability import get_logger, LogContext, metrics
-from src.schemas import AgentState, IngestionStatus
+from src.observability import get_logger, log_and_count, LogContext
+from src.schemas import AgentState, AgentStateDict, IngestionStatus
 
 # Initialize logger
 logger = get_logger(__name__)
 
 
 # =============================================================================
-# CONDITIONAL EDGES
+# ROUTING
 # =============================================================================
 
-def should_continue_to_architect(state: AgentState) -> Literal["architect", "end"]:
+def route_after_ingestion(update: dict) -> Literal["architect", "__end__"]:
     """
     Determine if we should proceed to Architect Agent.
     
+    Args:
+        update: State update returned by code_ingestion_node
+    
     Returns:
         "architect" if ingestion succeeded
-        "end" if ingestion failed
+        END if ingestion failed
     """
-    if state.ingestion_status == IngestionStatus.COMPLETED and state.repo_bundle:
+    if update.get("ingestion_status") == IngestionStatus.COMPLETED and update.get("repo_bundle"):
         logger.info("routing_to_architect", reason="ingestion_completed")
         return "architect"
     logger.info("routing_to_end", reason="ingestion_failed_or_incomplete")
-    return "end"
+    return END
 
 
-def check_completion(state: AgentState) -> Literal["end"]:
+def _as_agent_state(state: AgentStateDict) -> AgentState:
     """
-    Final check after architect node.
+    View graph channel values as an AgentState without re-validating them.
     
-    Always ends - this is the terminal node.
+    Values were validated when the run's input entered the graph, and node
+    updates are built from the schema models themselves.
     """
-    logger.info("workflow_completing")
-    return "end"
+    return AgentState.model_construct(**state)
+
+
+async def ingest_and_route(state: AgentStateDict) -> Command[Literal["architect", "__end__"]]:
+    """
+    Run code ingestion and route on its result in the same step.
+    
+    Returning a Command applies the update and the routing decision together,
+    instead of re-reading the merged state in a separate conditional edge.
+    """
+    update = await code_ingestion_node(_as_agent_state(state))
+    return Command(update=update, goto=route_after_ingestion(update))
+
+
+async def run_architect(state: AgentStateDict) -> dict:
+    """Run the Architect Agent on the current graph state."""
+    return await architect_node(_as_agent_state(state))
 
 
 # =============================================================================
 # GRAPH BUILDER
 # =============================================================================
 
-def create_comprehension_graph(
-    checkpointer=None,
-    debug: bool = False,
-) -> StateGraph:
+def build_comprehension_workflow() -> StateGraph:
     """
-    Create the code comprehension workflow graph.
+    Build the (uncompiled) code comprehension workflow graph.
     
     The workflow:
     1. START → code_ingestion: Ingest GitHub repo
-    2. code_ingestion → (conditional):
+    2. code_ingestion → (routed by the node via Command):
        - If success → architect: Generate reports
        - If failure → END
     3. architect → END
     
-    Args:
-        checkpointer: Optional LangGraph checkpointer for state persistence
-        debug: Enable debug mode with detailed logging
-        
     Returns:
-        Compiled StateGraph ready for execution
+        StateGraph definition ready to be compiled
     """
-    logger.info("creating_comprehension_graph", debug=debug)
-    
-    # Create the graph with our state schema
-    workflow = StateGraph(AgentState)
+    # Create the graph with our state schema; AgentState validates the input
+    workflow = StateGraph(AgentStateDict, input_schema=AgentState)
     
     # Add nodes
-    workflow.add_node("code_ingestion", code_ingestion_node)
-    workflow.add_node("architect", architect_node)
+    workflow.add_node("code_ingestion", ingest_and_route)
+    workflow.add_node("architect", run_architect)
     
     logger.debug("nodes_added", nodes=["code_ingestion", "architect"])
     
     # Add edges
-    # Start → Code Ingestion
+    # Start → Code Ingestion (which routes itself to Architect or END)
     workflow.add_edge(START, "code_ingestion")
     
-    # Code Ingestion → Conditional routing
-    workflow.add_conditional_edges(
-        "code_ingestion",
-        should_continue_to_architect,
-        {
-            "architect": "architect",
-            "end": END,
-        },
-    )
-    
     # Architect → END
     workflow.add_edge("architect", END)
     
-    # Use memory saver if no checkpointer provided (for development)
-    if checkpointer is None:
-        checkpointer = MemorySaver()
-        logger.debug("using_memory_saver")
+    return workflow
+
+
+@lru_cache(maxsize=2)
+def _compile_comprehension_graph(debug: bool):
+    """Build and compile the checkpointer-less workflow once per debug flag."""
+    logger.info("creating_comprehension_graph", debug=debug)
+    
+    workflow = build_comprehension_workflow()
     
     # Compile the graph
-    compiled = workflow.compile(checkpointer=checkpointer)
+    compiled = workflow.compile()
     logger.info("graph_compiled")
     
     return compiled
 
 
+def create_comprehension_graph(
+    checkpointer=None,
+    debug: bool = False,
+    use_checkpointing: bool = False,
+) -> StateGraph:
+    """
+    Create the code comprehension workflow graph.
+    
+    The compiled graph is cached and shared; a checkpointer is attached to a
+    per-call copy, so runs never share checkpoint storage unless the caller
+    passes the same checkpointer.
+    
+    Args:
+        checkpointer: Optional LangGraph checkpointer for state persistence
+        debug: Enable debug mode with detailed logging
+        use_checkpointing: Attach a fresh MemorySaver when no checkpointer is
+            given. One-shot runs leave this off and skip checkpoint writes.
+        
+    Returns:
+        Compiled StateGraph ready for execution
+    """
+    compiled = _compile_comprehension_graph(debug)
+    
+    # Use memory saver if checkpointing requested without a checkpointer
+    if checkpointer is None and use_checkpointing:
+        checkpointer = MemorySaver()
+        logger.debug("using_memory_saver")
+    
+    if checkpointer is None:
+        return compiled
+    return compiled.copy(update={"checkpointer": checkpointer})
+
+
 # =============================================================================
 # GRAPH VISUALIZATION
 # =============================================================================
 
+@lru_cache(maxsize=1)
 def get_graph_mermaid() -> str:
     """
     Get Mermaid diagram representation of the graph.
     
+    The graph topology is fixed, so the diagram is rendered once and cached.
+    
     Returns:
         Mermaid diagram string
     """
@@ -132,6 +179,13 @@ def get_graph_mermaid() -> str:
     return graph.get_graph().draw_mermaid()
 
 
+@lru_cache(maxsize=1)
+def _get_graph_png() -> bytes:
+    """Render the graph as PNG once; rendering calls an external service."""
+    graph = create_comprehension_graph()
+    return graph.get_graph().draw_mermaid_png()
+
+
 def save_graph_image(output_path: str = "graph.png") -> None:
     """
     Save the graph as an image file.
@@ -142,10 +196,8 @@ def save_graph_image(output_path: str = "graph.png") -> None:
         output_path: Path to save the image
     """
     try:
-        graph = create_comprehension_graph()
-        graph_image = graph.get_graph().draw_mermaid_png()
-        with open(output_path, "wb") as f:
-            f.write(graph_image)
+        graph_image = _get_graph_png()
+        Path(output_path).write_bytes(graph_image)
         print(f"Graph saved to {output_path}")
     except Exception as e:
         print(f"Could not save graph image: {e}")
@@ -162,7 +214,8 @@ async def run_comprehension_workflow(
     ref: str = "main",
     business_objective: str | None = None,
     target_platforms: list[str] | None = None,
-    thread_id: str = "default",
+    thread_id: str | None = None,
+    use_checkpointing: bool | None = None,
 ) -> AgentState:
     """
     Run the full code comprehension workflow.
@@ -173,12 +226,17 @@ async def run_comprehension_workflow(
         business_objective: Optional business context objective
         target_platforms: Optional target platform list
         thread_id: Thread ID for checkpointing
+        use_checkpointing: Checkpoint the run into a fresh MemorySaver;
+            defaults to True when a thread_id is given
         
     Returns:
         Final AgentState with reports
     """
     from src.schemas import BusinessContext, TargetArchitecture
     
+    if use_checkpointing is None:
+        use_checkpointing = thread_id is not None
+    
     with LogContext(repo_url=repo_url, ref=ref, thread_id=thread_id):
         logger.info("workflow_started")
         
@@ -194,40 +252,65 @@ async def run_comprehension_workflow(
             ) if target_platforms else None,
         )
         
-        # Create and run graph
-        graph = create_comprehension_graph()
+        graph = create_comprehension_graph(use_checkpointing=use_checkpointing)
         
         # Run with thread ID for checkpointing
-        config = {"configurable": {"thread_id": thread_id}}
+        config = {"configurable": {"thread_id": thread_id or "default"}}
         
         try:
             result = await graph.ainvoke(initial_state, config)
-            logger.info("workflow_completed")
-            metrics.increment("workflows_completed", tags={"status": "success"})
+            log_and_count(logger, "workflow_completed", "workflows_completed", "success")
             return result
-        except Exception as e:
-            logger.exception("workflow_failed")
-            metrics.increment("workflows_completed", tags={"status": "failed"})
+        except Exception:
+            log_and_count(logger, "workflow_failed", "workflows_completed", "failed", level="exception")
             raise
 
 
+class _SyncLoop:
+    """A thread's event loop for the sync wrappers, closed along with it."""
+    
+    __slots__ = ("loop", "__weakref__")
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        # Runs when the owning thread exits and drops its thread-local
+        # state, or at interpreter exit for threads still alive
+        weakref.finalize(self, self.loop.close)
+
+
+_sync_loops = threading.local()
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    """Return this thread's reusable event loop for the sync wrappers."""
+    holder = getattr(_sync_loops, "holder", None)
+    if holder is None or holder.loop.is_closed():
+        holder = _SyncLoop()
+        _sync_loops.holder = holder
+    return holder.loop
+
+
 def run_comprehension_workflow_sync(
     repo_url: str,
     ref: str = "main",
     business_objective: str | None = None,
     target_platforms: list[str] | None = None,
-    thread_id: str = "default",
+    thread_id: str | None = None,
+    use_checkpointing: bool | None = None,
 ) -> AgentState:
     """
     Synchronous wrapper for run_comprehension_workflow.
+    
+    Repeated calls on the same thread share one event loop, so loop setup is
+    paid once and pooled connections in cached LLM clients stay usable.
     """
-    import asyncio
-    return asyncio.run(run_comprehension_workflow(
+    return _get_sync_loop().run_until_complete(run_comprehension_workflow(
         repo_url=repo_url,
         ref=ref,
         business_objective=business_objective,
         target_platforms=target_platforms,
         thread_id=thread_id,
+        use_checkpointing=use_checkpointing,
     ))
 
 
@@ -239,6 +322,9 @@ async def stream_comprehension_workflow(
     repo_url: str,
     ref: str = "main",
     thread_id: str = "default",
+    use_checkpointing: bool = False,
+    durability: Durability = "exit",
+    checkpointer=None,
 ):
     """
     Stream the comprehension workflow with real-time updates.
@@ -249,6 +335,12 @@ async def stream_comprehension_workflow(
         repo_url: GitHub repository URL
         ref: Git reference
         thread_id: Thread ID for checkpointing
+        use_checkpointing: Checkpoint the run into a fresh MemorySaver
+        durability: When checkpoints are written. The default "exit"
+            writes a single checkpoint when the run finishes instead of one
+            per node; pass "async" or "sync" if mid-run recovery is needed.
+        checkpointer: Checkpointer to write to; pass one to read the final
+            state back with get_latest_state_fast()
         
     Yields:
         Tuple of (node_name, state_update)
@@ -258,14 +350,47 @@ async def stream_comprehension_workflow(
         ref=ref,
     )
     
-    graph = create_comprehension_graph()
+    graph = create_comprehension_graph(
+        checkpointer=checkpointer,
+        use_checkpointing=use_checkpointing,
+    )
     config = {"configurable": {"thread_id": thread_id}}
     
-    async for event in graph.astream(initial_state, config):
+    async for event in graph.astream(initial_state, config, durability=durability):
         for node_name, state_update in event.items():
             yield node_name, state_update
 
 
+# =============================================================================
+# STATE READS
+# =============================================================================
+
+async def get_latest_state_fast(
+    thread_id: str,
+    checkpointer,
+) -> dict[str, Any] | None:
+    """
+    Read the latest checkpointed state values for a thread.
+    
+    Reads the checkpoint tuple directly instead of going through
+    graph.aget_state(), which also reconciles pending writes and builds a
+    full StateSnapshot.
+    
+    Args:
+        thread_id: Thread ID the workflow ran under
+        checkpointer: Checkpointer the workflow ran with
+        
+    Returns:
+        Channel values of the latest checkpoint, or None if the thread has none
+    """
+    checkpoint_tuple = await checkpointer.aget_tuple(
+        {"configurable": {"thread_id": thread_id}}
+    )
+    if checkpoint_tuple is None:
+        return None
+    return checkpoint_tuple.checkpoint["channel_values"]
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
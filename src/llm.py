@@ -6,8 +6,9 @@ Creates LLM instances based on configuration.
 Supports OpenAI, Azure OpenAI, and Anthropic.
 """
 
+from functools import lru_cache
+
 from langchain_core.language_models import BaseChatModel
-from langchain_openai import AzureChatOpenAI, ChatOpenAI
 
 from src.config import get_settings
 from src.observability import get_logger, MissingAPIKeyError
@@ -21,7 +22,10 @@ def get_llm(
     max_tokens: int | None = None,
 ) -> BaseChatModel:
     """
-    Create an LLM instance based on settings.
+    Get an LLM instance based on settings.
+    
+    Instances are cached per (provider, temperature, max_tokens), so
+    repeated node invocations reuse the same client and connection pool.
     
     Args:
         temperature: Override default temperature
@@ -30,13 +34,18 @@ def get_llm(
     Returns:
         LLM instance configured for the selected provider
     """
-    settings = get_settings()
-    llm_settings = settings.llm
+    llm_settings = get_settings().llm
     
     temp = temperature if temperature is not None else llm_settings.temperature
     tokens = max_tokens if max_tokens is not None else llm_settings.max_tokens
     
-    provider = llm_settings.llm_provider
+    return _build_llm(llm_settings.llm_provider, temp, tokens)
+
+
+@lru_cache(maxsize=8)
+def _build_llm(provider: str, temp: float, tokens: int) -> BaseChatModel:
+    """Create and cache an LLM instance for the given provider and parameters."""
+    llm_settings = get_settings().llm
     logger.info("creating_llm", provider=provider, temperature=temp, max_tokens=tokens)
     
     try:
@@ -44,6 +53,8 @@ def get_llm(
             if not llm_settings.azure_openai_api_key:
                 raise MissingAPIKeyError("Azure OpenAI")
             
+            from langchain_openai import AzureChatOpenAI
+            
             llm = AzureChatOpenAI(
                 azure_endpoint=llm_settings.azure_openai_endpoint,
                 api_key=llm_settings.azure_openai_api_key,
@@ -75,6 +86,8 @@ def get_llm(
             if not llm_settings.openai_api_key:
                 raise MissingAPIKeyError("OpenAI")
             
+            from langchain_openai import ChatOpenAI
+            
             llm = ChatOpenAI(
                 api_key=llm_settings.openai_api_key,
                 model=llm_settings.openai_model,
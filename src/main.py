@@ -7,10 +7,10 @@ This module provides CLI commands to run the workflow.
 
 import argparse
 import asyncio
-import json
 import os
 import sys
-from datetime import datetime
+import time
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -18,6 +18,8 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
 
 def setup_langsmith():
     """Configure LangSmith tracing if enabled."""
@@ -26,6 +28,20 @@ def setup_langsmith():
         print(f"   Project: {os.getenv('LANGCHAIN_PROJECT', 'default')}")
 
 
+@lru_cache(maxsize=None)
+def get_report_template(name: str):
+    """Load and compile a report template from src/templates once."""
+    from jinja2 import Environment, FileSystemLoader
+    
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        auto_reload=False,
+        trim_blocks=True,
+        keep_trailing_newline=True,
+    )
+    return env.get_template(name)
+
+
 async def run_workflow(
     repo_url: str,
     ref: str = "main",
@@ -45,7 +61,10 @@ async def run_workflow(
         target_platforms: Optional target platforms
         verbose: Enable verbose output
     """
-    from src.graph import stream_comprehension_workflow
+    from langgraph.checkpoint.memory import MemorySaver
+    
+    from src.graph import get_latest_state_fast, stream_comprehension_workflow
+    from src.schemas import IngestionStatus
     
     print("🚀 Starting Code Comprehension Workflow")
     print(f"   Repository: {repo_url}")
@@ -58,21 +77,23 @@ async def run_workflow(
     output_path.mkdir(parents=True, exist_ok=True)
     
     # Generate thread ID for this run
-    thread_id = f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    thread_id = f"run_{time.time_ns():x}"
+    checkpointer = MemorySaver()
     
-    final_state = None
+    streamed = False
     
     # Stream workflow with progress updates
     async for node_name, state_update in stream_comprehension_workflow(
         repo_url=repo_url,
         ref=ref,
         thread_id=thread_id,
+        checkpointer=checkpointer,
     ):
         if node_name == "code_ingestion":
             print("📦 Code Ingestion Agent")
             if "ingestion_status" in state_update:
                 status = state_update["ingestion_status"]
-                print(f"   Status: {status.value if hasattr(status, 'value') else status}")
+                print(f"   Status: {IngestionStatus.from_str(status).value}")
             if "repo_bundle" in state_update and state_update["repo_bundle"]:
                 bundle = state_update["repo_bundle"]
                 print(f"   Files: {bundle.total_files}")
@@ -97,68 +118,40 @@ async def run_workflow(
                 print(f"   ❌ Error: {state_update['error']}")
             print()
         
-        final_state = state_update
+        streamed = True
+    
+    # Read the accumulated state once, straight from the checkpoint
+    final_state = await get_latest_state_fast(thread_id, checkpointer) if streamed else None
     
     # Save outputs
     if final_state:
         print("💾 Saving Reports...")
         
         # Save business report
-        if hasattr(final_state, 'business_report') and final_state.business_report:
-            biz_report = final_state.business_report
+        biz_report = final_state.get("business_report")
+        if biz_report is not None:
             biz_path = output_path / "business_report.md"
-            with open(biz_path, "w") as f:
-                f.write("# Business Comprehension Report\n\n")
-                f.write(f"## Executive Summary\n\n{biz_report.executive_summary}\n\n")
-                f.write(f"## Current State\n\n{biz_report.current_state}\n\n")
-                f.write("## Options Analysis\n\n")
-                f.write("| Option | Description | Effort | Risk | Recommended |\n")
-                f.write("|--------|-------------|--------|------|-------------|\n")
-                for opt in biz_report.options:
-                    rec = "✅" if opt.recommended else ""
-                    f.write(f"| {opt.name} | {opt.description[:50]}... | {opt.effort.value} | {opt.risk_level.value} | {rec} |\n")
-                f.write(f"\n## Value & KPIs\n\n{biz_report.value_and_kpis}\n\n")
-                f.write(f"## Adoption Roadmap\n\n{biz_report.adoption_plan}\n\n")
-                if biz_report.diagram_mermaid:
-                    f.write(f"## Architecture Diagram\n\n```mermaid\n{biz_report.diagram_mermaid}\n```\n")
+            biz_path.write_text(
+                get_report_template("business_report.md.j2").render(report=biz_report),
+                encoding="utf-8",
+            )
             print(f"   ✅ {biz_path}")
         
         # Save technical report
-        if hasattr(final_state, 'technical_report') and final_state.technical_report:
-            tech_report = final_state.technical_report
+        tech_report = final_state.get("technical_report")
+        if tech_report is not None:
             tech_path = output_path / "technical_report.md"
-            with open(tech_path, "w") as f:
-                f.write("# Technical Comprehension Report\n\n")
-                f.write(f"## 1. Codebase Map\n\n{tech_report.codebase_map}\n\n")
-                f.write(f"## 2. Topology\n\n{tech_report.topology}\n\n")
-                f.write(f"## 3. Security & Compliance\n\n{tech_report.security_compliance}\n\n")
-                f.write(f"## 4. Non-Functional Requirements\n\n{tech_report.nfrs}\n\n")
-                f.write("## 5. Risk Register\n\n")
-                f.write("| ID | Category | Severity | Title |\n")
-                f.write("|----|----------|----------|-------|\n")
-                for risk in tech_report.risk_register:
-                    f.write(f"| {risk.id} | {risk.category} | {risk.severity.value} | {risk.title} |\n")
-                f.write(f"\n## 6. Target Architecture\n\n{tech_report.target_architecture}\n\n")
-                if tech_report.architecture_diagram_mermaid:
-                    f.write(f"```mermaid\n{tech_report.architecture_diagram_mermaid}\n```\n\n")
-                f.write("## 7. Migration Playbook\n\n")
-                for wave in tech_report.migration_plan:
-                    f.write(f"### Wave {wave.wave_number}: {wave.name} ({wave.duration_weeks} weeks)\n\n")
-                    for task in wave.tasks:
-                        f.write(f"- {task}\n")
-                    f.write("\n")
-                f.write("## 8. Backlog Slice\n\n")
-                f.write("| ID | Title | Effort | Sprint |\n")
-                f.write("|----|-------|--------|--------|\n")
-                for item in tech_report.backlog_slice:
-                    f.write(f"| {item.id} | {item.title} | {item.effort.value} | {item.sprint} |\n")
+            tech_path.write_text(
+                get_report_template("technical_report.md.j2").render(report=tech_report),
+                encoding="utf-8",
+            )
             print(f"   ✅ {tech_path}")
         
         # Save repo bundle as JSON
-        if hasattr(final_state, 'repo_bundle') and final_state.repo_bundle:
+        repo_bundle = final_state.get("repo_bundle")
+        if repo_bundle is not None:
             bundle_path = output_path / "repo_bundle.json"
-            with open(bundle_path, "w") as f:
-                json.dump(final_state.repo_bundle.model_dump(mode="json"), f, indent=2, default=str)
+            bundle_path.write_text(repo_bundle.model_dump_json(indent=2), encoding="utf-8")
             print(f"   ✅ {bundle_path}")
         
         print()
@@ -225,6 +218,9 @@ Examples:
     
     args = parser.parse_args()
     
+    from src.observability import init_default_logging
+    init_default_logging()
+    
     # Print graph if requested
     if args.graph:
         from src.graph import get_graph_mermaid
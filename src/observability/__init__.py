@@ -36,6 +36,8 @@ from .logging import (
     configure_logging,
     get_correlation_id,
     get_logger,
+    init_default_logging,
+    log_and_count,
     metrics,
     new_correlation_id,
     set_correlation_id,
@@ -45,6 +47,7 @@ from .logging import (
 __all__ = [
     # Logging
     "configure_logging",
+    "init_default_logging",
     "get_logger",
     "get_correlation_id",
     "set_correlation_id",
@@ -54,6 +57,7 @@ __all__ = [
     "track_performance",
     "MetricsCollector",
     "metrics",
+    "log_and_count",
     # Exceptions
     "CodeComprehensionError",
     "ConfigurationError",
@@ -11,17 +11,23 @@ Provides:
 """
 
 import logging
+import os
 import sys
+import threading
 import time
-import uuid
+from collections import ChainMap, defaultdict
 from contextvars import ContextVar
-from datetime import datetime
 from functools import wraps
+from inspect import iscoroutinefunction
 from typing import Any, Callable
 
 import structlog
 from structlog.types import Processor
 
+from src import __version__
+
+SERVICE_NAME = "code-comprehension"
+
 # =============================================================================
 # CONTEXT VARIABLES
 # =============================================================================
@@ -30,18 +36,45 @@ from structlog.types import Processor
 correlation_id_var: ContextVar[str] = ContextVar("correlation_id", default="")
 
 # Current operation context
-operation_context_var: ContextVar[dict] = ContextVar("operation_context", default={})
+operation_context_var: ContextVar[ChainMap] = ContextVar("operation_context", default=ChainMap())
 
 
 # =============================================================================
 # CORRELATION ID MANAGEMENT
 # =============================================================================
 
+# Number of UUIDs generated per os.urandom() call
+_UUID_POOL_SIZE = 64
+
+_uuid_pools = threading.local()
+
+
+def _refill_uuid_pool() -> list[str]:
+    """Generate a batch of random (version 4) UUID strings from one urandom read."""
+    raw = bytearray(os.urandom(16 * _UUID_POOL_SIZE))
+    # Set the version (4) and RFC 4122 variant bits of every 16-byte block
+    raw[6::16] = bytes((b & 0x0F) | 0x40 for b in raw[6::16])
+    raw[8::16] = bytes((b & 0x3F) | 0x80 for b in raw[8::16])
+    h = raw.hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, 32 * _UUID_POOL_SIZE, 32)
+    ]
+
+
+def _new_uuid() -> str:
+    """Return a random UUID string, equivalent to str(uuid.uuid4())."""
+    pool = getattr(_uuid_pools, "pool", None)
+    if not pool:
+        pool = _uuid_pools.pool = _refill_uuid_pool()
+    return pool.pop()
+
+
 def get_correlation_id() -> str:
     """Get current correlation ID or generate new one."""
     cid = correlation_id_var.get()
     if not cid:
-        cid = str(uuid.uuid4())
+        cid = _new_uuid()
         correlation_id_var.set(cid)
     return cid
 
@@ -53,7 +86,7 @@ def set_correlation_id(correlation_id: str) -> None:
 
 def new_correlation_id() -> str:
     """Generate and set new correlation ID."""
-    cid = str(uuid.uuid4())
+    cid = _new_uuid()
     correlation_id_var.set(cid)
     return cid
 
@@ -62,43 +95,64 @@ def new_correlation_id() -> str:
 # CUSTOM PROCESSORS
 # =============================================================================
 
-def add_correlation_id(
-    logger: logging.Logger,
-    method_name: str,
-    event_dict: dict[str, Any],
-) -> dict[str, Any]:
-    """Add correlation ID to log events."""
-    event_dict["correlation_id"] = get_correlation_id()
-    return event_dict
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") for the most recently logged second
+_timestamp_prefix: tuple[int, str] = (-1, "")
 
 
-def add_timestamp(
-    logger: logging.Logger,
-    method_name: str,
-    event_dict: dict[str, Any],
-) -> dict[str, Any]:
-    """Add ISO timestamp to log events."""
-    event_dict["timestamp"] = datetime.utcnow().isoformat() + "Z"
-    return event_dict
+def _utc_timestamp() -> str:
+    """ISO timestamp (UTC, microsecond precision) with a per-second cached prefix."""
+    global _timestamp_prefix
+    ns = time.time_ns()
+    sec, us = divmod(ns // 1000, 1_000_000)
+    cached_sec, prefix = _timestamp_prefix
+    if sec != cached_sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _timestamp_prefix = (sec, prefix)
+    return f"{prefix}.{us:06d}Z"
+
+
+# Minimum level accepted by level_gate; set by configure_logging()
+_min_level_no = logging.NOTSET
 
+# structlog method names -> numeric levels (includes aliases like "exception")
+_METHOD_LEVELS = {
+    **{name.lower(): level for name, level in logging.getLevelNamesMapping().items()},
+    "exception": logging.ERROR,
+    "warn": logging.WARNING,
+}
 
-def add_service_info(
+
+def level_gate(
     logger: logging.Logger,
     method_name: str,
     event_dict: dict[str, Any],
 ) -> dict[str, Any]:
-    """Add service information to log events."""
-    event_dict["service"] = "code-comprehension"
-    event_dict["version"] = "0.2.0"
+    """
+    Drop events below the configured level before any enrichment runs.
+    
+    Placed first in the processor chain so rejected events never read the
+    clock or the context variables.
+    """
+    if _METHOD_LEVELS.get(method_name, logging.CRITICAL) < _min_level_no:
+        raise structlog.DropEvent
     return event_dict
 
 
-def add_operation_context(
+def enrich_event(
     logger: logging.Logger,
     method_name: str,
     event_dict: dict[str, Any],
 ) -> dict[str, Any]:
-    """Add operation context to log events."""
+    """
+    Add timestamp, correlation ID, service info and operation context to log events.
+    
+    A single processor does all four enrichments so each event pays for one
+    processor call rather than four.
+    """
+    event_dict["timestamp"] = _utc_timestamp()
+    event_dict["correlation_id"] = get_correlation_id()
+    event_dict["service"] = SERVICE_NAME
+    event_dict["version"] = __version__
     ctx = operation_context_var.get()
     if ctx:
         event_dict.update(ctx)
@@ -122,6 +176,10 @@ def configure_logging(
         json_format: Use JSON format (True for production, False for development)
         log_file: Optional file path for log output
     """
+    global _configured, _min_level_no
+    _configured = True
+    _min_level_no = getattr(logging, level.upper())
+    
     # Determine renderer based on format preference
     if json_format:
         renderer = structlog.processors.JSONRenderer()
@@ -130,12 +188,10 @@ def configure_logging(
     
     # Configure processors
     processors: list[Processor] = [
+        level_gate,
         structlog.contextvars.merge_contextvars,
         structlog.processors.add_log_level,
-        add_timestamp,
-        add_correlation_id,
-        add_service_info,
-        add_operation_context,
+        enrich_event,
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
@@ -179,15 +235,27 @@ def get_logger(name: str = __name__) -> structlog.BoundLogger:
 class PerformanceTracker:
     """Track performance metrics for operations."""
     
+    __slots__ = ("operation", "logger", "start_time", "end_time", "_metadata")
+    
+    _perf_counter = staticmethod(time.perf_counter)
+    
     def __init__(self, operation: str, logger: structlog.BoundLogger | None = None):
         self.operation = operation
         self.logger = logger or get_logger()
         self.start_time: float | None = None
         self.end_time: float | None = None
-        self.metadata: dict[str, Any] = {}
+        # Created on first add_metadata(); most trackers never add any
+        self._metadata: dict[str, Any] | None = None
+    
+    @property
+    def metadata(self) -> dict[str, Any]:
+        """Metadata included in the completion log."""
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
     
     def __enter__(self):
-        self.start_time = time.perf_counter()
+        self.start_time = self._perf_counter()
         self.logger.info(
             "operation_started",
             operation=self.operation,
@@ -195,8 +263,9 @@ class PerformanceTracker:
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.end_time = time.perf_counter()
+        self.end_time = self._perf_counter()
         duration_ms = (self.end_time - self.start_time) * 1000
+        metadata = self._metadata or {}
         
         if exc_type:
             self.logger.error(
@@ -205,14 +274,14 @@ class PerformanceTracker:
                 duration_ms=round(duration_ms, 2),
                 error_type=exc_type.__name__,
                 error_message=str(exc_val),
-                **self.metadata,
+                **metadata,
             )
         else:
             self.logger.info(
                 "operation_completed",
                 operation=self.operation,
                 duration_ms=round(duration_ms, 2),
-                **self.metadata,
+                **metadata,
             )
         
         return False  # Don't suppress exceptions
@@ -225,30 +294,21 @@ class PerformanceTracker:
 def track_performance(operation: str):
     """Decorator to track function performance."""
     def decorator(func: Callable):
+        # structlog returns a lazy proxy, so this still honours configure_logging()
+        # calls made after decoration
+        logger = get_logger(func.__module__)
+        
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            logger = get_logger(func.__module__)
-            with PerformanceTracker(operation, logger) as tracker:
-                try:
-                    result = await func(*args, **kwargs)
-                    return result
-                except Exception as e:
-                    raise
+            with PerformanceTracker(operation, logger):
+                return await func(*args, **kwargs)
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            logger = get_logger(func.__module__)
-            with PerformanceTracker(operation, logger) as tracker:
-                try:
-                    result = func(*args, **kwargs)
-                    return result
-                except Exception as e:
-                    raise
+            with PerformanceTracker(operation, logger):
+                return func(*args, **kwargs)
         
-        import asyncio
-        if asyncio.iscoroutinefunction(func):
-            return async_wrapper
-        return sync_wrapper
+        return async_wrapper if iscoroutinefunction(func) else sync_wrapper
     
     return decorator
 
@@ -258,16 +318,20 @@ def track_performance(operation: str):
 # =============================================================================
 
 class LogContext:
-    """Context manager for adding temporary context to logs."""
+    """
+    Context manager for adding temporary context to logs.
+    
+    Nested contexts are layered with ChainMap, so entering one only adds a
+    reference to the new keys instead of copying the accumulated context.
+    """
     
     def __init__(self, **kwargs):
         self.context = kwargs
         self.token = None
     
     def __enter__(self):
-        current = operation_context_var.get().copy()
-        current.update(self.context)
-        self.token = operation_context_var.set(current)
+        parent = operation_context_var.get()
+        self.token = operation_context_var.set(parent.new_child(self.context))
         return self
     
     def __exit__(self, *args):
@@ -280,48 +344,52 @@ class LogContext:
 # =============================================================================
 
 class MetricsCollector:
-    """Simple metrics collector for observability."""
+    """
+    Simple metrics collector for observability.
     
-    _instance = None
+    Use the module-level `metrics` instance rather than creating collectors.
+    """
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._metrics = {
-                "counters": {},
-                "gauges": {},
-                "histograms": {},
-            }
-        return cls._instance
+    def __init__(self):
+        self.reset()
     
     def increment(self, name: str, value: int = 1, tags: dict | None = None):
         """Increment a counter metric."""
-        key = self._make_key(name, tags)
-        self._metrics["counters"][key] = self._metrics["counters"].get(key, 0) + value
+        self._counters[self._make_key(name, tags)] += value
     
     def gauge(self, name: str, value: float, tags: dict | None = None):
         """Set a gauge metric."""
-        key = self._make_key(name, tags)
-        self._metrics["gauges"][key] = value
+        self._gauges[self._make_key(name, tags)] = value
     
     def histogram(self, name: str, value: float, tags: dict | None = None):
         """Record a histogram value."""
-        key = self._make_key(name, tags)
-        if key not in self._metrics["histograms"]:
-            self._metrics["histograms"][key] = []
-        self._metrics["histograms"][key].append(value)
+        self._histograms[self._make_key(name, tags)].append(value)
     
     def get_metrics(self) -> dict:
-        """Get all collected metrics."""
-        return self._metrics.copy()
+        """Get all collected metrics, keyed as "name[tag=value,...]"."""
+        format_key = self._format_key
+        return {
+            "counters": {format_key(key): value for key, value in self._counters.items()},
+            "gauges": {format_key(key): value for key, value in self._gauges.items()},
+            "histograms": {format_key(key): values for key, values in self._histograms.items()},
+        }
     
     def reset(self):
         """Reset all metrics."""
-        self._metrics = {"counters": {}, "gauges": {}, "histograms": {}}
+        self._counters: defaultdict[tuple, int] = defaultdict(int)
+        self._gauges: dict[tuple, float] = {}
+        self._histograms: defaultdict[tuple, list[float]] = defaultdict(list)
+    
+    @staticmethod
+    def _make_key(name: str, tags: dict | None) -> tuple[str, frozenset | None]:
+        # Hashable key; only stringified when metrics are read
+        return (name, frozenset(tags.items()) if tags else None)
     
-    def _make_key(self, name: str, tags: dict | None) -> str:
+    @staticmethod
+    def _format_key(key: tuple[str, frozenset | None]) -> str:
+        name, tags = key
         if tags:
-            tag_str = ",".join(f"{k}={v}" for k, v in sorted(tags.items()))
+            tag_str = ",".join(f"{k}={v}" for k, v in sorted(tags))
             return f"{name}[{tag_str}]"
         return name
 
@@ -330,15 +398,43 @@ class MetricsCollector:
 metrics = MetricsCollector()
 
 
+def log_and_count(
+    logger: structlog.BoundLogger,
+    event: str,
+    counter: str,
+    status: str,
+    level: str = "info",
+    **fields: Any,
+) -> None:
+    """
+    Log an outcome event and count it in one call.
+    
+    The counter is tagged with the same status that is logged, so workflow
+    boundaries emit one structured event instead of separate log and
+    metric calls.
+    """
+    metrics.increment(counter, tags={"status": status})
+    getattr(logger, level)(event, status=status, **fields)
+
+
 # =============================================================================
 # INITIALIZATION
 # =============================================================================
 
-# Configure logging on module import (can be reconfigured later)
-import os
+_configured = False
 
-_log_level = os.getenv("LOG_LEVEL", "INFO")
-_json_logs = os.getenv("LOG_FORMAT", "json").lower() == "json"
-_log_file = os.getenv("LOG_FILE")
 
-configure_logging(level=_log_level, json_format=_json_logs, log_file=_log_file)
+def init_default_logging() -> None:
+    """
+    Configure logging from LOG_LEVEL, LOG_FORMAT and LOG_FILE.
+    
+    Called by application entry points (CLI, API startup). Does nothing if
+    logging has already been configured.
+    """
+    if _configured:
+        return
+    configure_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        json_format=os.getenv("LOG_FORMAT", "json").lower() == "json",
+        log_file=os.getenv("LOG_FILE"),
+    )
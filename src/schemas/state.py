@@ -9,20 +9,37 @@ LangGraph uses typed state to enable:
 - Clear data contracts between agents
 """
 
+import fnmatch
+import re
+from dataclasses import field
 from datetime import datetime
 from enum import Enum
+from functools import cached_property, lru_cache
 from typing import Annotated, Any, Literal
 
 from langchain_core.messages import AnyMessage
 from langgraph.graph.message import add_messages
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, PlainSerializer
+from pydantic.dataclasses import dataclass
 
 
 # =============================================================================
 # ENUMS
 # =============================================================================
 
-class IngestionStatus(str, Enum):
+class _ValueLookupEnum(str, Enum):
+    """String enum with a dict-backed lookup for parsing raw values."""
+    
+    @classmethod
+    def from_str(cls, value: str):
+        """Return the member for value; raises ValueError like cls(value)."""
+        try:
+            return cls._value2member_map_[value]
+        except (KeyError, TypeError):
+            return cls(value)
+
+
+class IngestionStatus(_ValueLookupEnum):
     """Status of the code ingestion process."""
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -30,13 +47,13 @@ class IngestionStatus(str, Enum):
     FAILED = "failed"
 
 
-class ReportType(str, Enum):
+class ReportType(_ValueLookupEnum):
     """Type of comprehension report."""
     BUSINESS = "business"
     TECHNICAL = "technical"
 
 
-class RiskSeverity(str, Enum):
+class RiskSeverity(_ValueLookupEnum):
     """Severity level for identified risks."""
     CRITICAL = "critical"
     HIGH = "high"
@@ -45,7 +62,7 @@ class RiskSeverity(str, Enum):
     INFO = "info"
 
 
-class EffortBand(str, Enum):
+class EffortBand(_ValueLookupEnum):
     """Effort estimation bands."""
     SMALL = "S"
     MEDIUM = "M"
@@ -57,22 +74,41 @@ class EffortBand(str, Enum):
 # SUB-MODELS
 # =============================================================================
 
-class FileInfo(BaseModel):
+def _checksum_from_hex(value: Any) -> Any:
+    return bytes.fromhex(value) if isinstance(value, str) else value
+
+
+# Raw digest bytes (half the size of hex text); hex-encoded in JSON
+Checksum = Annotated[
+    bytes | None,
+    BeforeValidator(_checksum_from_hex),
+    PlainSerializer(lambda v: v.hex() if v is not None else None, when_used="json"),
+]
+
+
+# FileInfo and DependencyInfo are created once per file/dependency, so they
+# are slotted pydantic dataclasses: validated on construction like a model,
+# without BaseModel's per-instance __dict__ and field-set tracking. RepoBundle
+# accepts the validated instances as-is.
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class FileInfo:
     """Information about a file in the repository."""
     path: str
     language: str | None = None
     size_bytes: int = 0
     classification: str | None = None  # code, config, docs, iac, cicd, tests
-    checksum: str | None = None
+    checksum: Checksum = None  # Git blob SHA as raw bytes
 
 
-class DependencyInfo(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class DependencyInfo:
     """Information about a dependency."""
     name: str
     version: str | None = None
     package_manager: str  # npm, pip, maven, gradle, cargo, go
     is_dev: bool = False
-    vulnerabilities: list[str] = Field(default_factory=list)
+    vulnerabilities: list[str] = field(default_factory=list)
 
 
 class RiskItem(BaseModel):
@@ -87,20 +123,40 @@ class RiskItem(BaseModel):
     effort: EffortBand | None = None
 
 
+DEFAULT_EXCLUDE_GLOBS = (
+    "**/*.pem", "**/*.key", "**/.env",
+    "dist/**", "build/**", "node_modules/**",
+    "**/*.jar", "**/*.zip", "**/*.pdf",
+)
+
+
+@lru_cache(maxsize=32)
+def compile_globs(globs: tuple[str, ...]) -> re.Pattern[str]:
+    """Compile fnmatch-style globs into one regex matching any of them."""
+    if not globs:
+        return re.compile(r"(?!)")  # Never matches
+    return re.compile("|".join(fnmatch.translate(glob) for glob in globs))
+
+
 class IngestionPolicy(BaseModel):
     """Policy for code ingestion."""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     max_file_mb: float = 2.0
-    exclude_globs: list[str] = Field(default_factory=lambda: [
-        "**/*.pem", "**/*.key", "**/.env", 
-        "dist/**", "build/**", "node_modules/**",
-        "**/*.jar", "**/*.zip", "**/*.pdf",
-    ])
+    exclude_globs: tuple[str, ...] = DEFAULT_EXCLUDE_GLOBS
     include_tests: bool = True
     redact_secrets: bool = True
+    
+    @cached_property
+    def exclude_matcher(self) -> re.Pattern[str]:
+        """Compiled regex matching any of exclude_globs (use .match(path))."""
+        return compile_globs(self.exclude_globs)
 
 
 class IndexingProfile(BaseModel):
     """Profile for indexing operations."""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     code_embeddings: bool = True
     doc_embeddings: bool = True
     test_discovery: bool = True
@@ -235,11 +291,14 @@ class AgentState(BaseModel):
     Main state schema for the LangGraph agent workflow.
     
     This state flows through all agents and accumulates results.
+    The compiled graph validates its input against this model and carries
+    the values as AgentStateDict; nodes receive them as an AgentState.
     Using Pydantic models enables:
     - Type validation
     - Automatic serialization for checkpointing
     - Clear documentation of state structure
     """
+    model_config = ConfigDict(frozen=True, extra="forbid")
     
     # Message history (uses LangGraph's add_messages reducer)
     messages: Annotated[list[AnyMessage], add_messages] = Field(default_factory=list)
@@ -247,14 +306,14 @@ class AgentState(BaseModel):
     # Input parameters
     repo_url: str | None = None
     ref: str = "main"
-    path_filters: list[str] = Field(default_factory=list)
+    path_filters: tuple[str, ...] = ()
     ingestion_policy: IngestionPolicy = Field(default_factory=IngestionPolicy)
     indexing_profile: IndexingProfile = Field(default_factory=IndexingProfile)
     
     # Business context for Architect Agent
     business_context: BusinessContext | None = None
     target_architecture: TargetArchitecture | None = None
-    report_audience: list[str] = Field(default_factory=lambda: ["Exec", "Architect"])
+    report_audience: tuple[str, ...] = ("Exec", "Architect")
     
     # Ingestion state
     ingestion_status: IngestionStatus = IngestionStatus.PENDING
@@ -274,25 +333,27 @@ class AgentState(BaseModel):
 # TYPE ALIASES for LangGraph
 # =============================================================================
 
-# For use with TypedDict if needed (LangGraph supports both)
+# Graph channel schema. Nodes exchange plain dicts, so LangGraph does not
+# re-validate the whole (potentially large) state on every node hop; inputs
+# are validated once through AgentState at the graph boundary.
 from typing import TypedDict
 
 
 class AgentStateDict(TypedDict, total=False):
-    """TypedDict version for LangGraph compatibility."""
+    """TypedDict state schema used by the compiled LangGraph workflow."""
     messages: Annotated[list[AnyMessage], add_messages]
     repo_url: str | None
     ref: str
-    path_filters: list[str]
-    ingestion_policy: dict
-    indexing_profile: dict
-    business_context: dict | None
-    target_architecture: dict | None
-    report_audience: list[str]
-    ingestion_status: str
-    repo_bundle: dict | None
-    business_report: dict | None
-    technical_report: dict | None
+    path_filters: tuple[str, ...]
+    ingestion_policy: IngestionPolicy
+    indexing_profile: IndexingProfile
+    business_context: BusinessContext | None
+    target_architecture: TargetArchitecture | None
+    report_audience: tuple[str, ...]
+    ingestion_status: IngestionStatus
+    repo_bundle: RepoBundle | None
+    business_report: BusinessReport | None
+    technical_report: TechnicalReport | None
     current_agent: str | None
     error: str | None
     completed: bool
@@ -6,11 +6,12 @@ Provides GitHub API operations for the Code Ingestion Agent.
 Implements read-only operations: file reading, search, dependency discovery.
 """
 
-import base64
+import asyncio
 import fnmatch
-import hashlib
 import re
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 from typing import AsyncIterator
 
 from github import Github, GithubException
@@ -28,9 +29,25 @@ from src.observability import (
 )
 from src.schemas import DependencyInfo, FileInfo, IngestionPolicy
 
+try:
+    # Linear-time (DFA) matching for the secret scanner; no backtracking
+    # blowups on long minified or adversarial files
+    import re2
+except ImportError:  # pragma: no cover - wheel not available on this platform
+    re2 = None
+
+try:
+    # Several times faster than the stdlib parser on large manifests
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
+
 # Initialize logger
 logger = get_logger(__name__)
 
+# Returned by GitHubService._get_cached_content() when there is no fresh entry
+_CACHE_MISS = object()
+
 
 class GitHubService:
     """
@@ -89,26 +106,77 @@ class GitHubService:
         "composer": ["composer.json", "composer.lock"],
     }
     
-    # Secret patterns for redaction
+    # File extension (without the dot) -> language
+    LANGUAGE_EXTENSIONS = {
+        "py": "python",
+        "js": "javascript",
+        "ts": "typescript",
+        "jsx": "javascript",
+        "tsx": "typescript",
+        "java": "java",
+        "cs": "csharp",
+        "go": "go",
+        "rs": "rust",
+        "cpp": "cpp",
+        "c": "c",
+        "rb": "ruby",
+        "php": "php",
+        "swift": "swift",
+        "kt": "kotlin",
+        "scala": "scala",
+    }
+    
+    # Maximum directory listings fetched concurrently by list_files()
+    LIST_FILES_CONCURRENCY = 16
+    
+    # Files fetched per GraphQL request by get_files_batch()
+    GRAPHQL_BATCH_SIZE = 50
+    
+    # Fetched file text cache, keyed by (repo, ref, path), and file listing
+    # cache, keyed by (repo, ref, path). Both are dropped for a repository
+    # when get_repository() sees that it changed. The text cache is also
+    # bounded by total characters, and texts above the per-entry limit are
+    # not cached at all.
+    CONTENT_CACHE_SIZE = 2048
+    CONTENT_CACHE_MAX_CHARS = 64 * 1024 * 1024
+    CONTENT_CACHE_MAX_ENTRY_CHARS = 1024 * 1024
+    LISTING_CACHE_SIZE = 32
+    
+    # requirements.txt line: package, optional specifier operator, version.
+    # Scanned over the whole file; surrounding blanks on each line are
+    # skipped, and comment/blank lines cannot match.
+    PIP_REQUIREMENT_PATTERN = re.compile(
+        r'^[^\S\n]*([a-zA-Z0-9_-]+)([<>=!~]+)?(.*?)[^\S\n]*$', re.MULTILINE
+    )
+    
+    # owner/repo after "github.com/" or "github.com:", minus a ".git" suffix;
+    # anything after the repo segment (e.g. "/tree/main") is ignored
+    REPO_URL_PATTERN = re.compile(r'github\.com[/:]+([^/]+)/([^/]+?)(?:\.git)?/*(?:/|$)')
+    
+    # Secret patterns for redaction. Values run to the end of the token (the
+    # next whitespace or quote; quote or newline for connection strings), so
+    # long secrets are redacted whole. API key and token values must start
+    # with 20 characters of their class.
+    # Matching is case-insensitive except inside (?-i:...) groups.
     SECRET_PATTERNS = [
         # API Keys
-        (r'(?i)(api[_-]?key|apikey)\s*[:=]\s*["\']?([a-zA-Z0-9_\-]{20,})["\']?', "API_KEY"),
+        (r'(api[_-]?key|apikey)\s*[:=]\s*["\']?([a-zA-Z0-9_\-]{20}[^\s"\']*)["\']?', "API_KEY"),
         # Passwords
-        (r'(?i)(password|passwd|pwd)\s*[:=]\s*["\']?([^\s"\']{8,})["\']?', "PASSWORD"),
+        (r'(password|passwd|pwd)\s*[:=]\s*["\']?([^\s"\']{8,})["\']?', "PASSWORD"),
         # Tokens
-        (r'(?i)(token|bearer|auth)\s*[:=]\s*["\']?([a-zA-Z0-9_\-\.]{20,})["\']?', "TOKEN"),
+        (r'(token|bearer|auth)\s*[:=]\s*["\']?([a-zA-Z0-9_\-\.]{20}[^\s"\']*)["\']?', "TOKEN"),
         # AWS
-        (r'AKIA[0-9A-Z]{16}', "AWS_ACCESS_KEY"),
-        (r'(?i)aws[_-]?secret[_-]?access[_-]?key\s*[:=]\s*["\']?([a-zA-Z0-9/+=]{40})["\']?', "AWS_SECRET"),
+        (r'(?-i:\bAKIA[0-9A-Z]{16})', "AWS_ACCESS_KEY"),
+        (r'aws[_-]?secret[_-]?access[_-]?key\s*[:=]\s*["\']?([a-zA-Z0-9/+=]{40})["\']?', "AWS_SECRET"),
         # Azure
-        (r'(?i)(azure|az)[_-]?(client|tenant|subscription)[_-]?(id|secret)\s*[:=]\s*["\']?([a-zA-Z0-9\-]{36})["\']?', "AZURE_CREDENTIAL"),
+        (r'(azure|az)[_-]?(client|tenant|subscription)[_-]?(id|secret)\s*[:=]\s*["\']?([a-zA-Z0-9\-]{36})["\']?', "AZURE_CREDENTIAL"),
         # Connection strings
-        (r'(?i)connection[_-]?string\s*[:=]\s*["\']?([^"\']+)["\']?', "CONNECTION_STRING"),
+        (r'connection[_-]?string\s*[:=]\s*["\']?([^"\'\n]+)["\']?', "CONNECTION_STRING"),
         # Private keys
-        (r'-----BEGIN (RSA |EC |OPENSSH |)PRIVATE KEY-----', "PRIVATE_KEY"),
+        (r'(?-i:-----BEGIN (RSA |EC |OPENSSH |)PRIVATE KEY-----)', "PRIVATE_KEY"),
         # GitHub tokens
-        (r'ghp_[a-zA-Z0-9]{36}', "GITHUB_PAT"),
-        (r'github_pat_[a-zA-Z0-9]{22}_[a-zA-Z0-9]{59}', "GITHUB_PAT"),
+        (r'(?-i:\bghp_[a-zA-Z0-9]{36})', "GITHUB_PAT"),
+        (r'(?-i:\bgithub_pat_[a-zA-Z0-9]{22}_[a-zA-Z0-9]{59})', "GITHUB_PAT"),
     ]
     
     def __init__(self):
@@ -120,45 +188,148 @@ class GitHubService:
         else:
             self.github = Github()
             logger.warning("github_unauthenticated", message="No GitHub token configured, using unauthenticated access (rate limited)")
-        self._compiled_patterns = [
-            (re.compile(pattern), replacement)
-            for pattern, replacement in self.SECRET_PATTERNS
-        ]
+        # All secret patterns fused into one alternation (group K<i> is
+        # SECRET_PATTERNS[i]) under a single IGNORECASE flag, so redaction
+        # scans each file only once
+        self._fused_secret_pattern = self._compile_secret_scanner("(?i)" + "|".join(
+            f"(?P<K{i}>{pattern})"
+            for i, (pattern, _) in enumerate(self.SECRET_PATTERNS)
+        ))
+        # Cheap literal check run first: every secret pattern requires one
+        # of these words, so files without any skip the full scan
+        self._secret_prefilter = self._compile_secret_scanner(
+            r"(?i)key|pass|pwd|token|bearer|auth|secret|client|tenant|subscription"
+            r"|connection|akia|ghp_|github_pat_"
+        )
+        secret_labels = {
+            f"K{i}": f"[REDACTED_{replacement}]"
+            for i, (_, replacement) in enumerate(self.SECRET_PATTERNS)
+        }
+        # Replacement callback built once; maps the matched group to its label
+        self._secret_replacement = lambda match: secret_labels[match.lastgroup]
+        # All classification globs fused into one regex with a named group
+        # per classification, in FILE_CLASSIFICATIONS order
+        self._classifier = re.compile("|".join(
+            f"(?P<{classification}>{'|'.join(fnmatch.translate(p) for p in patterns)})"
+            for classification, patterns in self.FILE_CLASSIFICATIONS.items()
+        ))
+        self._classification_rank = {
+            classification: rank
+            for rank, classification in enumerate(self.FILE_CLASSIFICATIONS)
+        }
+        # Basenames repeat heavily across a repo (README.md, __init__.py,
+        # package.json...), so their classification is memoized
+        self._classify_name = lru_cache(maxsize=4096)(self._match_classification)
+        # Suffix globs ("*.py", "*_test.go") match a full path exactly when
+        # they match its basename, so only the remaining globs can change the
+        # result of a full-path check
+        path_globs = {
+            classification: [p for p in patterns if not self._is_suffix_glob(p)]
+            for classification, patterns in self.FILE_CLASSIFICATIONS.items()
+        }
+        self._path_classifier = re.compile("|".join(
+            f"(?P<{classification}>{'|'.join(fnmatch.translate(p) for p in patterns)})"
+            for classification, patterns in path_globs.items()
+            if patterns
+        ))
+        # Basename results ranked at or before this cannot be beaten by the path
+        self._path_min_rank = min(
+            self._classification_rank[classification]
+            for classification, patterns in path_globs.items()
+            if patterns
+        )
+        # Repository handles by lowercased "owner/repo"; saves a metadata
+        # request per lookup. Listing and content caches are keyed by the
+        # canonical repository.full_name.
+        self._repo_cache: dict[str, Repository] = {}
+        # In-flight async lookups by URL, shared by concurrent callers
+        self._repo_lookups: dict[str, asyncio.Task[Repository]] = {}
+        self._content_cache: OrderedDict[tuple[str, str, str], str | None] = OrderedDict()
+        self._content_cache_chars = 0
+        self._listing_cache: OrderedDict[tuple[str, str, str], list[tuple[str, int, str | None]]] = OrderedDict()
         logger.info("github_service_initialized")
     
+    @staticmethod
+    def _compile_secret_scanner(pattern: str):
+        """Compile a secret-scanning pattern with RE2, falling back to re."""
+        # The value patterns are open-ended and run over whole files, some of
+        # them long minified lines; RE2 matches them in linear time
+        if re2 is not None:
+            try:
+                return re2.compile(pattern)
+            except re2.error:
+                logger.warning("re2_pattern_rejected", fallback="re")
+        return re.compile(pattern)
+    
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _parse_repo_url(repo_url: str) -> tuple[str, str]:
+        """
+        Extract (owner, repo) from a GitHub URL.
+        
+        Supports: https://github.com/owner/repo, git@github.com:owner/repo.git
+        
+        Raises:
+            InvalidRepositoryURLError: If the URL is not a GitHub repository URL
+        """
+        match = GitHubService.REPO_URL_PATTERN.search(repo_url)
+        if match is None:
+            raise InvalidRepositoryURLError(repo_url)
+        return match.group(1), match.group(2)
+    
     def get_repository(self, repo_url: str) -> Repository:
-        """Get repository object from URL."""
+        """Get repository object from URL (cached per owner/repo)."""
+        repository, changed = self._lookup_repository(repo_url)
+        if changed:
+            self._invalidate_caches(repository.full_name)
+        return repository
+    
+    def _lookup_repository(self, repo_url: str) -> tuple[Repository, bool]:
+        """
+        Look up a repository, revalidating a cached handle.
+        
+        Does not touch the listing and content caches, so it can run in a
+        worker thread; callers invalidate them when the repository changed.
+        
+        Returns:
+            Tuple of (repository, whether a cached handle saw the repo change)
+        """
         logger.debug("getting_repository", repo_url=repo_url)
         
-        # Extract owner/repo from URL
-        # Supports: https://github.com/owner/repo, git@github.com:owner/repo.git
         try:
-            if "github.com" in repo_url:
-                parts = repo_url.rstrip("/").rstrip(".git").split("github.com")[-1]
-                parts = parts.lstrip("/:").split("/")
-                if len(parts) < 2:
-                    raise InvalidRepositoryURLError(repo_url)
-                owner, repo = parts[0], parts[1]
+            owner, repo = self._parse_repo_url(repo_url)
+            full_name = f"{owner}/{repo}"
+            # GitHub names are case-insensitive, so "Owner/Repo" and
+            # "owner/repo" share one handle
+            cache_key = full_name.lower()
+            
+            try:
+                repository = self._repo_cache.get(cache_key)
+                if repository is not None:
+                    # Conditional (If-None-Match) request: an unchanged repo
+                    # answers 304, which does not count against the rate limit
+                    changed = repository.update()
+                    if changed:
+                        logger.debug("repository_changed", full_name=repository.full_name)
+                    return repository, changed
                 
-                try:
-                    repository = self.github.get_repo(f"{owner}/{repo}")
-                    logger.info("repository_accessed", full_name=repository.full_name)
-                    metrics.increment("github_repos_accessed")
-                    return repository
-                except GithubException as e:
-                    if e.status == 404:
-                        logger.error("repository_not_found", repo_url=repo_url)
-                        raise RepositoryNotFoundError(repo_url)
-                    elif e.status == 403:
-                        if "rate limit" in str(e).lower():
-                            logger.error("rate_limit_exceeded")
-                            raise GitHubRateLimitError()
-                        logger.error("access_denied", repo_url=repo_url)
-                        raise RepositoryAccessDeniedError(repo_url)
-                    else:
-                        raise
-            else:
-                raise InvalidRepositoryURLError(repo_url)
+                repository = self.github.get_repo(full_name)
+                logger.info("repository_accessed", full_name=repository.full_name)
+                metrics.increment("github_repos_accessed")
+                self._repo_cache[cache_key] = repository
+                return repository, False
+            except GithubException as e:
+                if e.status == 404:
+                    logger.error("repository_not_found", repo_url=repo_url)
+                    raise RepositoryNotFoundError(repo_url)
+                elif e.status == 403:
+                    if "rate limit" in str(e).lower():
+                        logger.error("rate_limit_exceeded")
+                        raise GitHubRateLimitError()
+                    logger.error("access_denied", repo_url=repo_url)
+                    raise RepositoryAccessDeniedError(repo_url)
+                else:
+                    raise
         except (InvalidRepositoryURLError, RepositoryNotFoundError, 
                 RepositoryAccessDeniedError, GitHubRateLimitError):
             raise
@@ -166,20 +337,63 @@ class GitHubService:
             logger.error("unexpected_github_error", error=str(e))
             raise
     
+    async def get_repository_async(self, repo_url: str) -> Repository:
+        """
+        Async get_repository() that runs off the event loop.
+        
+        Concurrent calls for the same URL share one lookup, so a burst of
+        workflows on one repository makes a single round-trip to GitHub.
+        """
+        lookup = self._repo_lookups.get(repo_url)
+        if lookup is None or lookup.get_loop() is not asyncio.get_running_loop():
+            lookup = asyncio.create_task(self._get_repository_off_loop(repo_url))
+            self._repo_lookups[repo_url] = lookup
+            lookup.add_done_callback(
+                lambda done: self._repo_lookups.pop(repo_url, None)
+                if self._repo_lookups.get(repo_url) is done else None
+            )
+        # Shielded so one cancelled caller does not cancel the others' lookup
+        return await asyncio.shield(lookup)
+    
+    async def _get_repository_off_loop(self, repo_url: str) -> Repository:
+        """Look up a repository in a worker thread, invalidating caches on the loop."""
+        repository, changed = await asyncio.to_thread(self._lookup_repository, repo_url)
+        if changed:
+            # The listing and content caches are only mutated on the loop
+            self._invalidate_caches(repository.full_name)
+        return repository
+    
+    def _match_classification(self, path_form: str) -> str | None:
+        """First classification (in declaration order) matching a path form."""
+        match = self._classifier.match(path_form)
+        return match.lastgroup if match else None
+    
+    @staticmethod
+    def _is_suffix_glob(pattern: str) -> bool:
+        """True for "*<literal>" globs whose literal part has no "/"."""
+        suffix = pattern[1:]
+        return pattern.startswith("*") and not any(c in suffix for c in "*?[/")
+    
     def classify_file(self, path: str) -> str | None:
         """Classify a file based on its path/name."""
-        for classification, patterns in self.FILE_CLASSIFICATIONS.items():
-            for pattern in patterns:
-                if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(path.split("/")[-1], pattern):
-                    return classification
-        return None
+        rank = self._classification_rank
+        by_name = self._classify_name(path[path.rfind("/") + 1:])
+        if by_name is not None and rank[by_name] <= self._path_min_rank:
+            return by_name
+        # Globs like "*test*.py" and ".github/workflows/*.yml" can also match
+        # on directories, so check the full path against those
+        match = self._path_classifier.match(path)
+        by_path = match.lastgroup if match else None
+        if by_path is None:
+            return by_name
+        if by_name is None:
+            return by_path
+        # The earlier classification wins, as when both forms were checked per class
+        return min(by_path, by_name, key=rank.__getitem__)
     
     def should_exclude(self, path: str, policy: IngestionPolicy) -> bool:
         """Check if a file should be excluded based on policy."""
-        for pattern in policy.exclude_globs:
-            if fnmatch.fnmatch(path, pattern):
-                return True
-        return False
+        return policy.exclude_matcher.match(path) is not None
     
     def redact_secrets(self, content: str) -> tuple[str, int]:
         """
@@ -188,16 +402,194 @@ class GitHubService:
         Returns:
             Tuple of (redacted_content, count_of_redactions)
         """
-        redaction_count = 0
-        result = content
+        if self._secret_prefilter.search(content) is None:
+            return content, 0
+        return self._fused_secret_pattern.subn(self._secret_replacement, content)
+    
+    async def _list_directory(
+        self,
+        repo: Repository,
+        ref: str,
+        path: str,
+        semaphore: asyncio.Semaphore,
+        pending: list[asyncio.Task],
+        failed_paths: list[str],
+    ) -> tuple[list[ContentFile], dict[str, asyncio.Task]]:
+        """
+        Fetch one directory listing and start fetching its subdirectories.
+        
+        Listings that fail for a reason other than a 404 are recorded in
+        failed_paths and treated as empty.
+        
+        Returns:
+            Tuple of (contents, subdirectory listing tasks keyed by path)
+        """
+        async with semaphore:
+            try:
+                # PyGithub is blocking; run the HTTP round-trip off the loop
+                contents = await asyncio.to_thread(repo.get_contents, path, ref=ref)
+            except GithubException as e:
+                if e.status == 404:
+                    logger.warning("path_not_found", path=path, ref=ref)
+                else:
+                    logger.error("list_files_error", path=path, error=str(e))
+                    failed_paths.append(path)
+                return [], {}
+            except Exception as e:
+                logger.error("list_files_unexpected_error", error=str(e))
+                failed_paths.append(path)
+                return [], {}
+        
+        if not isinstance(contents, list):
+            contents = [contents]
         
-        for pattern, replacement in self._compiled_patterns:
-            matches = pattern.findall(result)
-            if matches:
-                redaction_count += len(matches)
-                result = pattern.sub(f"[REDACTED_{replacement}]", result)
+        subdirectories = {}
+        for content in contents:
+            if content.type == "dir":
+                task = asyncio.create_task(
+                    self._list_directory(repo, ref, content.path, semaphore, pending, failed_paths)
+                )
+                pending.append(task)
+                subdirectories[content.path] = task
+        return contents, subdirectories
+    
+    async def _walk_contents(
+        self,
+        repo: Repository,
+        ref: str,
+        path: str,
+        failed_paths: list[str],
+    ) -> AsyncIterator[ContentFile]:
+        """
+        Walk the contents API depth-first, yielding non-directory entries.
         
-        return result, redaction_count
+        Directory listings are fetched concurrently (up to
+        LIST_FILES_CONCURRENCY at a time) as soon as their parent is known.
+        Directories that could not be listed are added to failed_paths.
+        """
+        semaphore = asyncio.Semaphore(self.LIST_FILES_CONCURRENCY)
+        pending: list[asyncio.Task] = []
+        
+        try:
+            contents, subdirectories = await self._list_directory(
+                repo, ref, path, semaphore, pending, failed_paths
+            )
+            # Each stack entry is (remaining contents, subdirectory tasks)
+            stack = [(iter(contents), subdirectories)]
+            while stack:
+                entries, subdirectories = stack[-1]
+                for content in entries:
+                    if content.type == "dir":
+                        contents, subtasks = await subdirectories[content.path]
+                        stack.append((iter(contents), subtasks))
+                        break
+                    yield content
+                else:
+                    stack.pop()
+        finally:
+            # Stop any prefetches left over if the caller stopped iterating early
+            for task in pending:
+                task.cancel()
+    
+    async def _get_git_tree(self, repo: Repository, sha: str, recursive: bool):
+        """Fetch a Git tree by ref or tree SHA, or None if the call fails."""
+        try:
+            return await asyncio.to_thread(repo.get_git_tree, sha, recursive=recursive)
+        except Exception as e:
+            logger.warning("git_tree_unavailable", sha=sha, error=str(e))
+            return None
+    
+    async def _iter_files(
+        self,
+        repo: Repository,
+        ref: str,
+        path: str,
+        failed_paths: list[str],
+    ) -> AsyncIterator[tuple[str, int, str | None]]:
+        """
+        Yield (path, size, sha) for every file in the repository.
+        
+        Uses one recursive Git Trees API call. If that tree is truncated
+        (over the API's entry limit), each top-level directory's tree is
+        fetched separately, and only subtrees that are still truncated are
+        walked through the contents API. Tree results cover the whole
+        repository; callers filter them by path. Directories that could not
+        be listed are added to failed_paths, so the result is incomplete.
+        """
+        tree = await self._get_git_tree(repo, ref, recursive=True)
+        if tree is not None and not tree.truncated:
+            for element in tree.tree:
+                # Skip directories ("tree") and submodules ("commit")
+                if element.type == "blob":
+                    yield element.path, element.size, element.sha
+            return
+        
+        root = None
+        if tree is not None:
+            logger.warning("git_tree_truncated", ref=ref, entries=len(tree.tree))
+            root = await self._get_git_tree(repo, ref, recursive=False)
+        if root is None:
+            async for content in self._walk_contents(repo, ref, path, failed_paths):
+                yield content.path, content.size, content.sha
+            return
+        
+        semaphore = asyncio.Semaphore(self.LIST_FILES_CONCURRENCY)
+        
+        async def fetch_subtree(sha: str):
+            async with semaphore:
+                return await self._get_git_tree(repo, sha, recursive=True)
+        
+        subtrees = {
+            element.path: asyncio.create_task(fetch_subtree(element.sha))
+            for element in root.tree
+            if element.type == "tree"
+        }
+        try:
+            for element in root.tree:
+                if element.type == "blob":
+                    yield element.path, element.size, element.sha
+                elif element.type == "tree":
+                    subtree = await subtrees[element.path]
+                    if subtree is None or subtree.truncated:
+                        async for content in self._walk_contents(repo, ref, element.path, failed_paths):
+                            yield content.path, content.size, content.sha
+                        continue
+                    for sub in subtree.tree:
+                        if sub.type == "blob":
+                            yield f"{element.path}/{sub.path}", sub.size, sub.sha
+        finally:
+            for task in subtrees.values():
+                task.cancel()
+    
+    def _build_file_info(
+        self,
+        path: str,
+        size: int,
+        sha: str | None,
+        policy: IngestionPolicy,
+    ) -> FileInfo | None:
+        """Build FileInfo for a listed file, or None if the policy skips it."""
+        # Check exclusions
+        if self.should_exclude(path, policy):
+            return None
+        
+        # Check file size
+        if size > policy.max_file_mb * 1024 * 1024:
+            logger.debug("file_too_large", path=path, size=size)
+            return None
+        
+        # Skip test files if configured
+        classification = self.classify_file(path)
+        if classification == "tests" and not policy.include_tests:
+            return None
+        
+        return FileInfo(
+            path=path,
+            language=self._detect_language(path),
+            size_bytes=size,
+            classification=classification,
+            checksum=bytes.fromhex(sha) if sha else None,
+        )
     
     async def list_files(
         self,
@@ -209,6 +601,11 @@ class GitHubService:
         """
         List all files in the repository.
         
+        Uses a single recursive Git Trees API call where possible (see
+        _iter_files); falls back to walking the contents API per directory.
+        Complete listings are cached until get_repository() sees the repo
+        change.
+        
         Args:
             repo: GitHub repository object
             ref: Git reference (branch, tag, commit)
@@ -220,57 +617,63 @@ class GitHubService:
         """
         policy = policy or IngestionPolicy()
         
-        try:
-            contents = repo.get_contents(path, ref=ref)
-        except GithubException as e:
-            if e.status == 404:
-                logger.warning("path_not_found", path=path, ref=ref)
-            else:
-                logger.error("list_files_error", path=path, error=str(e))
-            return
-        except Exception as e:
-            logger.error("list_files_unexpected_error", error=str(e))
-            return
-        
-        if not isinstance(contents, list):
-            contents = [contents]
-        
         files_yielded = 0
         files_skipped = 0
         
-        for content in contents:
-            if content.type == "dir":
-                async for file_info in self.list_files(repo, ref, content.path, policy):
-                    yield file_info
-            else:
-                # Check exclusions
-                if self.should_exclude(content.path, policy):
-                    files_skipped += 1
-                    continue
-                
-                # Check file size
-                if content.size > policy.max_file_mb * 1024 * 1024:
-                    logger.debug("file_too_large", path=content.path, size=content.size)
-                    files_skipped += 1
-                    continue
-                
-                # Skip test files if configured
-                classification = self.classify_file(content.path)
-                if classification == "tests" and not policy.include_tests:
-                    files_skipped += 1
-                    continue
-                
-                yield FileInfo(
-                    path=content.path,
-                    language=self._detect_language(content.path),
-                    size_bytes=content.size,
-                    classification=classification,
-                    checksum=content.sha,
-                )
-                files_yielded += 1
+        cache_key = (repo.full_name, ref, path)
+        entries = self._listing_cache.get(cache_key)
+        if entries is None:
+            failed_paths: list[str] = []
+            entries = [entry async for entry in self._iter_files(repo, ref, path, failed_paths)]
+            # A partial listing is used once but not cached
+            if not failed_paths:
+                self._listing_cache[cache_key] = entries
+                if len(self._listing_cache) > self.LISTING_CACHE_SIZE:
+                    self._listing_cache.popitem(last=False)
+        else:
+            self._listing_cache.move_to_end(cache_key)
         
-        if path == "":  # Only log at root level
-            logger.debug("files_listed", yielded=files_yielded, skipped=files_skipped)
+        prefix = f"{path.strip('/')}/" if path else ""
+        for file_path, size, sha in entries:
+            if not file_path.startswith(prefix):
+                continue
+            file_info = self._build_file_info(file_path, size, sha, policy)
+            if file_info is None:
+                files_skipped += 1
+                continue
+            yield file_info
+            files_yielded += 1
+        
+        logger.debug("files_listed", yielded=files_yielded, skipped=files_skipped)
+    
+    def _get_cached_content(self, key: tuple[str, str, str]) -> str | None | object:
+        """Return cached text (None = known missing), or _CACHE_MISS."""
+        text = self._content_cache.get(key, _CACHE_MISS)
+        if text is not _CACHE_MISS:
+            self._content_cache.move_to_end(key)
+        return text
+    
+    def _cache_content(self, key: tuple[str, str, str], text: str | None) -> None:
+        """Store fetched text, evicting least recently used entries when full."""
+        size = len(text or "")
+        if size > self.CONTENT_CACHE_MAX_ENTRY_CHARS:
+            return
+        
+        self._content_cache_chars += size - len(self._content_cache.pop(key, None) or "")
+        self._content_cache[key] = text
+        while (
+            len(self._content_cache) > self.CONTENT_CACHE_SIZE
+            or self._content_cache_chars > self.CONTENT_CACHE_MAX_CHARS
+        ):
+            _, evicted = self._content_cache.popitem(last=False)
+            self._content_cache_chars -= len(evicted or "")
+    
+    def _invalidate_caches(self, full_name: str) -> None:
+        """Drop cached listings and file text for a repository."""
+        for key in [key for key in self._content_cache if key[0] == full_name]:
+            self._content_cache_chars -= len(self._content_cache.pop(key) or "")
+        for key in [key for key in self._listing_cache if key[0] == full_name]:
+            del self._listing_cache[key]
     
     def get_file_content(
         self,
@@ -285,70 +688,194 @@ class GitHubService:
         Returns:
             Tuple of (content, secrets_redacted_count)
         """
-        content_file = repo.get_contents(path, ref=ref)
-        
-        if isinstance(content_file, list):
-            raise ValueError(f"Path {path} is a directory")
-        
-        # Decode content
-        if content_file.encoding == "base64":
-            content = base64.b64decode(content_file.content).decode("utf-8", errors="replace")
-        else:
-            content = content_file.content or ""
+        cache_key = (repo.full_name, ref, path)
+        content = self._get_cached_content(cache_key)
+        # A known-missing entry is refetched, so the caller gets the same
+        # not-found error as for an uncached path
+        if content is _CACHE_MISS or content is None:
+            content_file = repo.get_contents(path, ref=ref)
+            
+            if isinstance(content_file, list):
+                raise ValueError(f"Path {path} is a directory")
+            
+            # Decode content
+            if content_file.encoding == "base64":
+                content = content_file.decoded_content.decode("utf-8", errors="replace")
+            else:
+                content = content_file.content or ""
+            self._cache_content(cache_key, content)
         
         if redact:
             return self.redact_secrets(content)
         
         return content, 0
     
+    def get_files_batch(
+        self,
+        repo: Repository,
+        paths: list[str],
+        ref: str = "main",
+    ) -> dict[str, str | None]:
+        """
+        Fetch the text of many files with batched GraphQL queries.
+        
+        Each request aliases up to GRAPHQL_BATCH_SIZE `object(expression:)`
+        lookups, replacing one REST call per file. GraphQL requires an
+        authenticated client.
+        
+        Returns:
+            Dict of path -> text, or None for paths that do not exist at ref.
+            Binary files are left out.
+            
+        Raises:
+            GithubException: If the GraphQL API rejects the request
+        """
+        owner, name = repo.full_name.split("/", 1)
+        texts = {}
+        
+        for start in range(0, len(paths), self.GRAPHQL_BATCH_SIZE):
+            batch = paths[start:start + self.GRAPHQL_BATCH_SIZE]
+            params = "".join(f", $e{i}: String!" for i in range(len(batch)))
+            fields = " ".join(
+                f"f{i}: object(expression: $e{i}) {{ ... on Blob {{ text }} }}"
+                for i in range(len(batch))
+            )
+            query = (
+                f"query($owner: String!, $name: String!{params}) "
+                f"{{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+            )
+            variables = {"owner": owner, "name": name}
+            variables.update({f"e{i}": f"{ref}:{path}" for i, path in enumerate(batch)})
+            
+            _, data = repo.requester.graphql_query(query, variables)
+            objects = data["data"]["repository"] or {}
+            for i, path in enumerate(batch):
+                blob = objects.get(f"f{i}")
+                # Missing paths resolve to null, binary blobs to null text
+                if blob is None:
+                    texts[path] = None
+                elif blob.get("text") is not None:
+                    texts[path] = blob["text"]
+        
+        return texts
+    
+    async def _get_files_rest(
+        self,
+        repo: Repository,
+        paths: list[str],
+        ref: str = "main",
+    ) -> dict[str, str | None]:
+        """
+        Fetch files with concurrent REST calls (fallback for get_files_batch).
+        
+        Up to LIST_FILES_CONCURRENCY requests run at once in worker threads,
+        so total latency is roughly one round-trip rather than one per path.
+        
+        Returns:
+            Dict of path -> text, or None for paths that do not exist at ref.
+            Paths whose fetch failed otherwise are left out.
+        """
+        semaphore = asyncio.Semaphore(self.LIST_FILES_CONCURRENCY)
+        texts: dict[str, str | None] = {}
+        
+        async def fetch(path: str) -> None:
+            async with semaphore:
+                try:
+                    content_file = await asyncio.to_thread(repo.get_contents, path, ref=ref)
+                    if isinstance(content_file, list):
+                        texts[path] = None  # A directory, not a file
+                    else:
+                        texts[path] = content_file.decoded_content.decode("utf-8")
+                except GithubException as e:
+                    if e.status == 404:
+                        texts[path] = None
+                    else:
+                        logger.warning("file_fetch_error", file=path, error=str(e))
+                except Exception as e:
+                    logger.warning("file_fetch_error", file=path, error=str(e))
+        
+        await asyncio.gather(*(fetch(path) for path in paths))
+        return texts
+    
     async def discover_dependencies(
         self,
         repo: Repository,
         ref: str = "main",
+        tree_paths: set[str] | None = None,
     ) -> list[DependencyInfo]:
         """
         Discover dependencies from common dependency files.
         
+        Args:
+            repo: GitHub repository object
+            ref: Git reference (branch, tag, commit)
+            tree_paths: Known file paths of the repo at ref; manifests not in
+                it are not fetched. Defaults to a cached list_files() listing.
+        
         Returns:
             List of discovered dependencies
         """
         dependencies = []
-        files_checked = 0
-        files_found = 0
         
-        for pkg_manager, patterns in self.DEPENDENCY_FILES.items():
-            for pattern in patterns:
-                try:
-                    # Handle glob patterns
-                    if "*" in pattern:
-                        continue  # Skip globs for now, would need directory listing
-                    
-                    files_checked += 1
-                    content_file = repo.get_contents(pattern, ref=ref)
-                    if isinstance(content_file, list):
-                        continue
-                    
-                    files_found += 1
-                    content = base64.b64decode(content_file.content).decode("utf-8")
-                    deps = self._parse_dependencies(content, pkg_manager, pattern)
-                    dependencies.extend(deps)
-                    logger.debug(
-                        "dependencies_parsed",
-                        file=pattern,
-                        pkg_manager=pkg_manager,
-                        count=len(deps),
-                    )
-                    
-                except GithubException:
-                    continue  # File doesn't exist
-                except Exception as e:
-                    logger.warning("dependency_parse_error", file=pattern, error=str(e))
-                    continue
+        if tree_paths is None:
+            entries = self._listing_cache.get((repo.full_name, ref, ""))
+            if entries:
+                tree_paths = {file_path for file_path, _, _ in entries}
+        
+        # Globs would need a directory listing, so only exact names are probed
+        candidates = [
+            (pkg_manager, pattern)
+            for pkg_manager, patterns in self.DEPENDENCY_FILES.items()
+            for pattern in patterns
+            if "*" not in pattern and (tree_paths is None or pattern in tree_paths)
+        ]
+        
+        # Serve recently fetched manifests (and known-missing ones) from cache
+        texts = {}
+        missing = []
+        for _, path in candidates:
+            cached = self._get_cached_content((repo.full_name, ref, path))
+            if cached is _CACHE_MISS:
+                missing.append(path)
+            elif cached is not None:
+                texts[path] = cached
+        
+        if missing:
+            try:
+                fetched = await asyncio.to_thread(self.get_files_batch, repo, missing, ref)
+            except GithubException as e:
+                # e.g. unauthenticated clients cannot use GraphQL
+                logger.debug("graphql_batch_unavailable", error=str(e))
+                fetched = await self._get_files_rest(repo, missing, ref=ref)
+            for path in missing:
+                if path not in fetched:
+                    continue  # Fetch failed; not cached, so retried next time
+                text = fetched[path]
+                self._cache_content((repo.full_name, ref, path), text)
+                if text is not None:
+                    texts[path] = text
+        
+        for pkg_manager, pattern in candidates:
+            content = texts.get(pattern)
+            if content is None:
+                continue
+            try:
+                deps = self._parse_dependencies(content, pkg_manager, pattern)
+            except Exception as e:
+                logger.warning("dependency_parse_error", file=pattern, error=str(e))
+                continue
+            dependencies.extend(deps)
+            logger.debug(
+                "dependencies_parsed",
+                file=pattern,
+                pkg_manager=pkg_manager,
+                count=len(deps),
+            )
         
         logger.info(
             "dependency_discovery_complete",
-            files_checked=files_checked,
-            files_found=files_found,
+            files_checked=len(candidates),
+            files_found=len(texts),
             total_dependencies=len(dependencies),
         )
         
@@ -356,29 +883,8 @@ class GitHubService:
     
     def _detect_language(self, path: str) -> str | None:
         """Detect programming language from file extension."""
-        ext_map = {
-            ".py": "python",
-            ".js": "javascript",
-            ".ts": "typescript",
-            ".jsx": "javascript",
-            ".tsx": "typescript",
-            ".java": "java",
-            ".cs": "csharp",
-            ".go": "go",
-            ".rs": "rust",
-            ".cpp": "cpp",
-            ".c": "c",
-            ".rb": "ruby",
-            ".php": "php",
-            ".swift": "swift",
-            ".kt": "kotlin",
-            ".scala": "scala",
-        }
-        
-        for ext, lang in ext_map.items():
-            if path.endswith(ext):
-                return lang
-        return None
+        dot = path.rfind(".")
+        return self.LANGUAGE_EXTENSIONS.get(path[dot + 1:]) if dot >= 0 else None
     
     def _parse_dependencies(
         self,
@@ -390,22 +896,17 @@ class GitHubService:
         dependencies = []
         
         if pkg_manager == "pip" and filename == "requirements.txt":
-            for line in content.split("\n"):
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    # Parse: package==version, package>=version, package
-                    match = re.match(r'^([a-zA-Z0-9_-]+)([<>=!~]+)?(.+)?$', line)
-                    if match:
-                        dependencies.append(DependencyInfo(
-                            name=match.group(1),
-                            version=match.group(3) if match.group(3) else None,
-                            package_manager="pip",
-                        ))
+            # Parse: package==version, package>=version, package
+            for match in self.PIP_REQUIREMENT_PATTERN.finditer(content):
+                dependencies.append(DependencyInfo(
+                    name=match.group(1),
+                    version=match.group(3) or None,
+                    package_manager="pip",
+                ))
         
         elif pkg_manager == "npm" and filename == "package.json":
-            import json
             try:
-                data = json.loads(content)
+                data = json_loads(content)
                 for name, version in data.get("dependencies", {}).items():
                     dependencies.append(DependencyInfo(
                         name=name,
@@ -419,7 +920,7 @@ class GitHubService:
                         package_manager="npm",
                         is_dev=True,
                     ))
-            except json.JSONDecodeError:
+            except ValueError:  # JSONDecodeError from either parser
                 pass
         
         # Add more parsers as needed...
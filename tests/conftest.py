@@ -3,8 +3,12 @@
 Pytest configuration and shared fixtures.
 """
 
+import importlib
 import os
 import sys
+from contextlib import ExitStack
+from datetime import datetime
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -12,72 +16,84 @@ import pytest
 # Ensure src is in path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+from src.schemas import (  # noqa: E402
+    BacklogItem,
+    BusinessReport,
+    DependencyInfo,
+    EffortBand,
+    FileInfo,
+    IngestionPolicy,
+    MigrationWave,
+    OptionItem,
+    RepoBundle,
+    RiskItem,
+    RiskSeverity,
+    TechnicalReport,
+)
+
 
 # =============================================================================
 # MOCK DATA FIXTURES
 # =============================================================================
+# Sample data is built once per run and shared; tests must not mutate it.
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_repo_url():
     """Sample GitHub repository URL."""
     return "https://github.com/microsoft/sample-repo"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_ref():
     """Sample Git reference."""
     return "main"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_file_infos():
     """Sample file information list."""
-    from src.schemas import FileInfo
-    
     return [
         FileInfo(
             path="src/main.py",
             language="python",
             size_bytes=1024,
             classification="code",
-            checksum="abc123",
+            checksum=bytes.fromhex("abc123"),
         ),
         FileInfo(
             path="src/utils.py",
             language="python",
             size_bytes=512,
             classification="code",
-            checksum="def456",
+            checksum=bytes.fromhex("def456"),
         ),
         FileInfo(
             path="requirements.txt",
             language=None,
             size_bytes=256,
             classification="config",
-            checksum="ghi789",
+            checksum=bytes.fromhex("a1b2c3"),
         ),
         FileInfo(
             path="README.md",
             language=None,
             size_bytes=2048,
             classification="docs",
-            checksum="jkl012",
+            checksum=bytes.fromhex("d4e5f6"),
         ),
         FileInfo(
             path="tests/test_main.py",
             language="python",
             size_bytes=768,
             classification="tests",
-            checksum="mno345",
+            checksum=bytes.fromhex("0a1b2c"),
         ),
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_dependencies():
     """Sample dependency information list."""
-    from src.schemas import DependencyInfo
-    
     return [
         DependencyInfo(name="fastapi", version="0.115.0", package_manager="pip"),
         DependencyInfo(name="pydantic", version="2.9.0", package_manager="pip"),
@@ -85,11 +101,9 @@ def sample_dependencies():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_risks():
     """Sample risk items."""
-    from src.schemas import RiskItem, RiskSeverity
-    
     return [
         RiskItem(
             id="RISK-001",
@@ -110,12 +124,9 @@ def sample_risks():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_repo_bundle(sample_file_infos, sample_dependencies, sample_risks):
     """Sample RepoBundle for testing."""
-    from datetime import datetime
-    from src.schemas import IngestionPolicy, RepoBundle
-    
     return RepoBundle(
         repo_url="https://github.com/microsoft/sample-repo",
         ref="main",
@@ -141,11 +152,9 @@ def sample_repo_bundle(sample_file_infos, sample_dependencies, sample_risks):
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_business_report():
     """Sample business report."""
-    from src.schemas import BusinessReport, OptionItem, EffortBand, RiskSeverity
-    
     return BusinessReport(
         executive_summary="This is a Python FastAPI application suitable for cloud migration.",
         current_state="Monolithic REST API with SQLite backend.",
@@ -177,13 +186,9 @@ def sample_business_report():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_technical_report(sample_risks):
     """Sample technical report."""
-    from src.schemas import (
-        TechnicalReport, MigrationWave, BacklogItem, EffortBand
-    )
-    
     return TechnicalReport(
         codebase_map="Python 100%: FastAPI-based REST API",
         topology="Single service with SQLite database",
@@ -231,35 +236,53 @@ def sample_technical_report(sample_risks):
     )
 
 
-@pytest.fixture
-def mock_github_service(sample_file_infos, sample_dependencies):
-    """Mock GitHub service."""
-    from src.services.github_service import GitHubService
+class FakeGitHubService:
+    """Stand-in for GitHubService serving canned files and dependencies."""
     
-    mock_service = MagicMock(spec=GitHubService)
+    def __init__(self, file_infos, dependencies):
+        self._file_infos = file_infos
+        self._dependencies = dependencies
+        self._repo = SimpleNamespace(full_name="microsoft/sample-repo")
     
-    # Mock repository
-    mock_repo = MagicMock()
-    mock_repo.full_name = "microsoft/sample-repo"
-    mock_service.get_repository.return_value = mock_repo
+    def get_repository(self, *args, **kwargs):
+        return self._repo
     
-    # Mock list_files as async generator
-    async def mock_list_files(*args, **kwargs):
-        for file_info in sample_file_infos:
-            yield file_info
+    async def get_repository_async(self, *args, **kwargs):
+        return self._repo
     
-    mock_service.list_files = mock_list_files
+    async def list_files(self, *args, **kwargs):
+        for file_info in self._file_infos:
+            yield file_info
     
-    # Mock discover_dependencies
-    async def mock_discover_deps(*args, **kwargs):
-        return sample_dependencies
+    async def discover_dependencies(self, *args, **kwargs):
+        return self._dependencies
+
+
+@pytest.fixture(scope="session")
+def mock_github_service(sample_file_infos, sample_dependencies):
+    """Mock GitHub service."""
+    return FakeGitHubService(sample_file_infos, sample_dependencies)
+
+
+class StubLLM:
+    """Chat model stand-in replying with canned responses in order; the last repeats."""
     
-    mock_service.discover_dependencies = mock_discover_deps
+    def __init__(self, *responses):
+        self._responses = list(responses)
     
-    return mock_service
+    async def ainvoke(self, *args, **kwargs):
+        if len(self._responses) > 1:
+            return self._responses.pop(0)
+        return self._responses[0]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def stub_llm():
+    """StubLLM class, for building per-test LLM stand-ins."""
+    return StubLLM
+
+
+@pytest.fixture(scope="session")
 def mock_llm_response():
     """Mock LLM response."""
     mock_response = MagicMock()
@@ -281,7 +304,7 @@ def mock_llm_response():
     return mock_response
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_business_report_response():
     """Mock LLM response for business report."""
     mock_response = MagicMock()
@@ -317,7 +340,7 @@ def mock_business_report_response():
     return mock_response
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_technical_report_response():
     """Mock LLM response for technical report."""
     mock_response = MagicMock()
@@ -363,13 +386,29 @@ def mock_technical_report_response():
     return mock_response
 
 
+@pytest.fixture
+def patched_agents():
+    """Patch the GitHub service and both agent LLM factories for one test."""
+    # The src.agents package re-exports the node functions under the module
+    # names, so the modules themselves are looked up by import path
+    architect_node = importlib.import_module("src.agents.architect_node")
+    code_ingestion_node = importlib.import_module("src.agents.code_ingestion_node")
+    
+    with ExitStack() as stack:
+        yield SimpleNamespace(
+            github=stack.enter_context(patch.object(code_ingestion_node, "get_github_service")),
+            ingestion_llm=stack.enter_context(patch.object(code_ingestion_node, "get_code_ingestion_llm")),
+            architect_llm=stack.enter_context(patch.object(architect_node, "get_architect_llm")),
+        )
+
+
 # =============================================================================
 # ENVIRONMENT FIXTURES
 # =============================================================================
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(autouse=True, scope="session")
 def mock_environment():
-    """Mock environment variables for tests."""
+    """Mock environment variables for the whole test run."""
     env_vars = {
         "LLM_PROVIDER": "openai",
         "OPENAI_API_KEY": "sk-test-key-for-testing",
@@ -379,3 +418,24 @@ def mock_environment():
     }
     with patch.dict(os.environ, env_vars):
         yield
+
+
+# =============================================================================
+# PROFILING
+# =============================================================================
+
+@pytest.fixture(autouse=True)
+def profile_test(request):
+    """With PYINSTRUMENT=1, write a pyinstrument report per test to prof/."""
+    if not os.getenv("PYINSTRUMENT"):
+        yield
+        return
+    from pyinstrument import Profiler
+    
+    profiler = Profiler(async_mode="enabled")
+    profiler.start()
+    yield
+    profiler.stop()
+    output_dir = request.config.rootpath / "prof"
+    output_dir.mkdir(exist_ok=True)
+    (output_dir / f"{request.node.name}.html").write_text(profiler.output_html(), encoding="utf-8")
@@ -3,21 +3,79 @@
 Unit tests for the REST API endpoints.
 """
 
+import os
+import time
+from datetime import datetime, timedelta
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+
+from src.api import (
+    RESULT_TTL_SECONDS,
+    ComprehensionRequest,
+    JobStatus,
+    app,
+    create_job,
+    expire_jobs,
+    get_result_path,
+    jobs,
+)
+from src.config import get_settings
 
 
 # =============================================================================
 # API CLIENT FIXTURE
 # =============================================================================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_client():
-    """Create test client for FastAPI app."""
-    from fastapi.testclient import TestClient
-    from src.api import app
-    
-    return TestClient(app)
+    """Test client for the FastAPI app, started once for the whole session."""
+    with TestClient(app) as client:
+        # First request builds the middleware stack; keep that out of test timings
+        client.get("/health")
+        yield client
+
+
+@pytest.fixture
+async def async_client():
+    """Async client calling the app in-process on the test's event loop."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def created_job_id():
+    """ID of a pending job registered directly, without starting a workflow."""
+    return create_job(
+        ComprehensionRequest(repo_url="https://github.com/owner/repo", ref="main"),
+        JobStatus.PENDING,
+    )
+
+
+@pytest.fixture
+def scheduled_jobs():
+    """Record background workflow runs queued by POST /analyze instead of running them."""
+    with patch("src.api.run_comprehension_job", new_callable=AsyncMock) as run_job:
+        yield run_job
+
+
+@pytest.fixture(autouse=True)
+def output_dir(tmp_path, monkeypatch):
+    """Persist job results under tmp_path instead of the repo's output directory."""
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    yield tmp_path
+    get_settings.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_jobs():
+    """Give every test an empty in-memory jobs store."""
+    jobs.clear()
+    yield
+    jobs.clear()
 
 
 # =============================================================================
@@ -64,43 +122,45 @@ class TestMetricsEndpoint:
 class TestAnalysisEndpoints:
     """Tests for the /analyze endpoints."""
     
-    def test_start_analysis_returns_job_id(self, test_client):
-        """Test POST /analyze returns job ID."""
-        response = test_client.post(
-            "/analyze",
-            json={
-                "repo_url": "https://github.com/microsoft/vscode",
-                "ref": "main",
-            },
-        )
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            pytest.param(
+                {
+                    "repo_url": "https://github.com/microsoft/vscode",
+                    "ref": "main",
+                },
+                id="minimal",
+            ),
+            pytest.param(
+                {
+                    "repo_url": "https://github.com/owner/repo",
+                    "ref": "develop",
+                    "business_objective": "Migrate to Azure",
+                    "constraints": ["Budget < $100k"],
+                    "kpis": ["99.9% uptime"],
+                    "compliance": ["SOC2"],
+                    "target_platforms": ["Azure AKS"],
+                    "target_patterns": ["Microservices"],
+                    "include_tests": True,
+                    "max_file_mb": 1.5,
+                },
+                id="full_options",
+            ),
+        ],
+    )
+    def test_start_analysis_returns_job_id(self, test_client, scheduled_jobs, payload):
+        """Test POST /analyze returns job ID and queues the workflow."""
+        response = test_client.post("/analyze", json=payload)
         
         assert response.status_code == 200
         data = response.json()
         assert "job_id" in data
         assert data["status"] == "pending"
         assert "message" in data
-    
-    def test_start_analysis_with_full_options(self, test_client):
-        """Test POST /analyze with all options."""
-        response = test_client.post(
-            "/analyze",
-            json={
-                "repo_url": "https://github.com/owner/repo",
-                "ref": "develop",
-                "business_objective": "Migrate to Azure",
-                "constraints": ["Budget < $100k"],
-                "kpis": ["99.9% uptime"],
-                "compliance": ["SOC2"],
-                "target_platforms": ["Azure AKS"],
-                "target_patterns": ["Microservices"],
-                "include_tests": True,
-                "max_file_mb": 1.5,
-            },
-        )
         
-        assert response.status_code == 200
-        data = response.json()
-        assert "job_id" in data
+        scheduled_jobs.assert_awaited_once()
+        assert scheduled_jobs.await_args.args[0] == data["job_id"]
     
     def test_get_nonexistent_job(self, test_client):
         """Test GET /analyze/{job_id} for nonexistent job."""
@@ -108,39 +168,26 @@ class TestAnalysisEndpoints:
         
         assert response.status_code == 404
     
-    def test_get_job_status(self, test_client):
+    def test_get_job_status(self, test_client, created_job_id):
         """Test GET /analyze/{job_id} for existing job."""
-        # First create a job
-        create_response = test_client.post(
-            "/analyze",
-            json={
-                "repo_url": "https://github.com/owner/repo",
-                "ref": "main",
-            },
-        )
-        job_id = create_response.json()["job_id"]
-        
-        # Then get its status
-        response = test_client.get(f"/analyze/{job_id}")
+        response = test_client.get(f"/analyze/{created_job_id}")
         
         assert response.status_code == 200
         data = response.json()
-        assert data["job_id"] == job_id
+        assert data["job_id"] == created_job_id
         assert "status" in data
         assert "created_at" in data
     
-    def test_list_jobs(self, test_client):
-        """Test GET /jobs lists all jobs."""
-        # Create a job first
-        test_client.post(
-            "/analyze",
-            json={
-                "repo_url": "https://github.com/owner/repo",
-                "ref": "main",
-            },
-        )
+    def test_get_result_of_pending_job(self, test_client, created_job_id):
+        """Test GET /analyze/{job_id}/result before the job completes."""
+        jobs[created_job_id]["status"] = JobStatus.RUNNING
         
-        # List jobs
+        response = test_client.get(f"/analyze/{created_job_id}/result")
+        
+        assert response.status_code == 409
+    
+    def test_list_jobs(self, test_client, created_job_id):
+        """Test GET /jobs lists all jobs."""
         response = test_client.get("/jobs")
         
         assert response.status_code == 200
@@ -148,25 +195,14 @@ class TestAnalysisEndpoints:
         assert isinstance(data, list)
         assert len(data) >= 1
     
-    def test_delete_job(self, test_client):
+    def test_delete_job(self, test_client, created_job_id):
         """Test DELETE /analyze/{job_id}."""
-        # Create a job
-        create_response = test_client.post(
-            "/analyze",
-            json={
-                "repo_url": "https://github.com/owner/repo",
-                "ref": "main",
-            },
-        )
-        job_id = create_response.json()["job_id"]
-        
-        # Delete it
-        response = test_client.delete(f"/analyze/{job_id}")
+        response = test_client.delete(f"/analyze/{created_job_id}")
         
         assert response.status_code == 200
         
         # Verify it's gone
-        get_response = test_client.get(f"/analyze/{job_id}")
+        get_response = test_client.get(f"/analyze/{created_job_id}")
         assert get_response.status_code == 404
     
     def test_delete_nonexistent_job(self, test_client):
@@ -174,6 +210,26 @@ class TestAnalysisEndpoints:
         response = test_client.delete("/analyze/nonexistent-id")
         
         assert response.status_code == 404
+    
+    async def test_expired_results_pruned(self, output_dir):
+        """Jobs whose results outlived the TTL are dropped with their payloads."""
+        request = ComprehensionRequest(repo_url="https://github.com/owner/repo", ref="main")
+        expired_id, fresh_id, failed_id = (create_job(request, JobStatus.COMPLETED) for _ in range(3))
+        expired, fresh = get_result_path(expired_id), get_result_path(fresh_id)
+        expired.parent.mkdir(parents=True)
+        expired.write_text("{}", encoding="utf-8")
+        fresh.write_text("{}", encoding="utf-8")
+        old = time.time() - RESULT_TTL_SECONDS - 60
+        os.utime(expired, (old, old))
+        # Failed jobs have no payload; they expire by completion time
+        jobs[failed_id]["status"] = JobStatus.FAILED
+        jobs[failed_id]["completed_at"] = datetime.utcnow() - timedelta(seconds=RESULT_TTL_SECONDS + 60)
+        
+        assert await expire_jobs() == 2
+        assert not expired.exists()
+        assert fresh.exists()
+        assert expired.parent == output_dir / "jobs"
+        assert set(jobs) == {fresh_id}
 
 
 # =============================================================================
@@ -183,44 +239,47 @@ class TestAnalysisEndpoints:
 class TestSyncAnalysis:
     """Tests for synchronous analysis endpoint."""
     
-    @pytest.mark.asyncio
     async def test_sync_analysis_success(
         self,
-        test_client,
+        async_client,
         mock_github_service,
         mock_llm_response,
         mock_business_report_response,
         mock_technical_report_response,
+        patched_agents,
+        stub_llm,
     ):
         """Test POST /analyze/sync returns results."""
-        with patch("src.agents.code_ingestion_node.get_github_service") as mock_gh:
-            with patch("src.agents.code_ingestion_node.get_code_ingestion_llm") as mock_ing_llm:
-                with patch("src.agents.architect_node.get_architect_llm") as mock_arch_llm:
-                    mock_gh.return_value = mock_github_service
-                    
-                    mock_ing_llm_instance = AsyncMock()
-                    mock_ing_llm_instance.ainvoke.return_value = mock_llm_response
-                    mock_ing_llm.return_value = mock_ing_llm_instance
-                    
-                    mock_arch_llm_instance = AsyncMock()
-                    mock_arch_llm_instance.ainvoke.side_effect = [
-                        mock_business_report_response,
-                        mock_technical_report_response,
-                    ]
-                    mock_arch_llm.return_value = mock_arch_llm_instance
-                    
-                    response = test_client.post(
-                        "/analyze/sync",
-                        json={
-                            "repo_url": "https://github.com/microsoft/test",
-                            "ref": "main",
-                        },
-                    )
+        patched_agents.github.return_value = mock_github_service
+        
+        patched_agents.ingestion_llm.return_value = stub_llm(mock_llm_response)
+        
+        patched_agents.architect_llm.return_value = stub_llm(
+            mock_business_report_response,
+            mock_technical_report_response,
+        )
+        
+        response = await async_client.post(
+            "/analyze/sync",
+            json={
+                "repo_url": "https://github.com/microsoft/test",
+                "ref": "main",
+            },
+        )
         
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "completed"
         assert "result" in data
+        assert set(data["result"]) == {"repo_bundle", "business_report", "technical_report"}
+        assert data["result"]["repo_bundle"]["total_files"] == 5
+        
+        # Full result is persisted and served separately from the job status
+        status = (await async_client.get(f"/analyze/{data['job_id']}")).json()
+        assert status["result"]["result_url"] == f"/analyze/{data['job_id']}/result"
+        result_response = await async_client.get(status["result"]["result_url"])
+        assert result_response.status_code == 200
+        assert result_response.json() == data["result"]
 
 
 # =============================================================================
@@ -259,23 +318,21 @@ class TestCorrelationId:
 class TestRequestValidation:
     """Tests for request validation."""
     
-    def test_missing_repo_url(self, test_client):
-        """Test POST /analyze fails without repo_url."""
-        response = test_client.post(
-            "/analyze",
-            json={
-                "ref": "main",
-            },
-        )
+    @pytest.mark.parametrize(
+        "request_kwargs",
+        [
+            pytest.param({"json": {"ref": "main"}}, id="missing_repo_url"),
+            pytest.param(
+                {
+                    "content": "not valid json",
+                    "headers": {"Content-Type": "application/json"},
+                },
+                id="invalid_json",
+            ),
+        ],
+    )
+    def test_invalid_request_rejected(self, test_client, request_kwargs):
+        """Test POST /analyze fails validation without repo_url or valid JSON."""
+        response = test_client.post("/analyze", **request_kwargs)
         
         assert response.status_code == 422  # Validation error
-    
-    def test_invalid_json(self, test_client):
-        """Test POST /analyze fails with invalid JSON."""
-        response = test_client.post(
-            "/analyze",
-            content="not valid json",
-            headers={"Content-Type": "application/json"},
-        )
-        
-        assert response.status_code == 422
@@ -0,0 +1,317 @@
+# Copyright (c) Microsoft. All rights reserved.
+"""
+Unit tests for the GitHub service, run against in-memory repository fakes.
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from github import GithubException
+
+from src.services.github_service import GitHubService
+
+
+SHA = "3b18e512dba79e4c8300dd08aeb37f8e728b8dad"
+
+
+def not_found() -> GithubException:
+    return GithubException(404, {"message": "Not Found"}, None)
+
+
+def tree_entry(path: str, type: str = "blob", sha: str = SHA, size: int = 10) -> SimpleNamespace:
+    """Git tree element (type is "blob", "tree" or "commit")."""
+    return SimpleNamespace(path=path, type=type, sha=sha, size=size)
+
+
+def git_tree(*entries: SimpleNamespace, truncated: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(tree=list(entries), truncated=truncated)
+
+
+def content_entry(path: str, type: str = "file") -> SimpleNamespace:
+    """Contents API entry (type is "file" or "dir")."""
+    return SimpleNamespace(path=path, type=type, sha=SHA, size=10)
+
+
+class FakeRequester:
+    """Answers aliased `object(expression:)` GraphQL queries from a path -> text dict."""
+    
+    def __init__(self, files, error=None):
+        # A None text stands for a binary blob
+        self.files = files
+        self.error = error
+        self.queries: list[dict] = []
+    
+    def graphql_query(self, query, variables):
+        self.queries.append(variables)
+        if self.error is not None:
+            raise self.error
+        objects = {}
+        for alias in variables:
+            if alias.startswith("e"):
+                path = variables[alias].split(":", 1)[1]
+                objects[f"f{alias[1:]}"] = (
+                    {"text": self.files[path]} if path in self.files else None
+                )
+        return {}, {"data": {"repository": objects}}
+
+
+class FakeRepository:
+    """Repository stub serving Git trees, contents listings and file text from dicts."""
+    
+    full_name = "owner/repo"
+    
+    def __init__(self, trees=None, contents=None, files=None, graphql_error=None):
+        # (sha, recursive) -> tree; path -> list of contents entries (or an
+        # exception to raise); path -> file text
+        self.trees = trees or {}
+        self.contents = contents or {}
+        self.files = files or {}
+        self.requester = FakeRequester(self.files, graphql_error)
+        self.contents_requests: list[str] = []
+    
+    def get_git_tree(self, sha, recursive=False):
+        if (sha, recursive) not in self.trees:
+            raise not_found()
+        return self.trees[sha, recursive]
+    
+    def get_contents(self, path, ref="main"):
+        self.contents_requests.append(path)
+        if path in self.files:
+            return SimpleNamespace(
+                encoding="base64",
+                decoded_content=self.files[path].encode(),
+                content=None,
+            )
+        if path not in self.contents:
+            raise not_found()
+        if isinstance(self.contents[path], Exception):
+            raise self.contents[path]
+        return self.contents[path]
+
+
+@pytest.fixture
+def github_service():
+    """A fresh GitHubService, so no caches carry over between tests."""
+    return GitHubService()
+
+
+async def listed_paths(service: GitHubService, repo: FakeRepository) -> list[str]:
+    return [file_info.path async for file_info in service.list_files(repo)]
+
+
+# =============================================================================
+# FILE LISTING TESTS
+# =============================================================================
+
+class TestListFiles:
+    """Tests for listing files through the Git Trees API."""
+    
+    async def test_recursive_tree_lists_blobs_only(self, github_service):
+        """Test a complete recursive tree is listed without the contents API."""
+        repo = FakeRepository(trees={
+            ("main", True): git_tree(
+                tree_entry("README.md"),
+                tree_entry("src", type="tree"),
+                tree_entry("src/app.py"),
+                tree_entry("vendor/lib", type="commit"),
+            ),
+        })
+        
+        files = [file_info async for file_info in github_service.list_files(repo)]
+        
+        assert [file_info.path for file_info in files] == ["README.md", "src/app.py"]
+        assert files[0].checksum == bytes.fromhex(SHA)
+        assert repo.contents_requests == []
+    
+    async def test_truncated_tree_lists_each_subtree(self, github_service):
+        """Test a truncated tree falls back to per-directory trees with prefixed paths."""
+        repo = FakeRepository(
+            trees={
+                ("main", True): git_tree(tree_entry("setup.py"), truncated=True),
+                ("main", False): git_tree(
+                    tree_entry("setup.py"),
+                    tree_entry("src", type="tree", sha="5" * 40),
+                    tree_entry("docs", type="tree", sha="d" * 40),
+                ),
+                ("5" * 40, True): git_tree(
+                    tree_entry("app.py"),
+                    tree_entry("pkg", type="tree"),
+                    tree_entry("pkg/mod.py"),
+                ),
+                # Still over the entry limit: walked through the contents API
+                ("d" * 40, True): git_tree(truncated=True),
+            },
+            contents={
+                "docs": [content_entry("docs/index.md"), content_entry("docs/api", type="dir")],
+                "docs/api": [content_entry("docs/api/ref.md")],
+            },
+        )
+        
+        assert await listed_paths(github_service, repo) == [
+            "setup.py",
+            "src/app.py",
+            "src/pkg/mod.py",
+            "docs/index.md",
+            "docs/api/ref.md",
+        ]
+        assert repo.contents_requests == ["docs", "docs/api"]
+
+
+
+# =============================================================================
+# FILE FETCHING TESTS
+# =============================================================================
+
+class TestFileFetching:
+    """Tests for batched GraphQL file fetches and their REST fallback."""
+    
+    def test_batch_maps_aliases_to_paths(self, github_service):
+        """Test each aliased object is returned under its own path, across batches."""
+        github_service.GRAPHQL_BATCH_SIZE = 2
+        repo = FakeRepository(files={"a.txt": "A", "b.txt": "B", "c.txt": "C"})
+        
+        texts = github_service.get_files_batch(repo, ["c.txt", "a.txt", "b.txt"], ref="dev")
+        
+        assert texts == {"a.txt": "A", "b.txt": "B", "c.txt": "C"}
+        assert repo.requester.queries == [
+            {"owner": "owner", "name": "repo", "e0": "dev:c.txt", "e1": "dev:a.txt"},
+            {"owner": "owner", "name": "repo", "e0": "dev:b.txt"},
+        ]
+    
+    def test_batch_reports_missing_paths(self, github_service):
+        """Test null objects come back as not-found and binary blobs are left out."""
+        repo = FakeRepository(files={"logo.png": None, "README.md": "# Repo"})
+        
+        texts = github_service.get_files_batch(repo, ["README.md", "missing.txt", "logo.png"])
+        
+        assert texts == {"README.md": "# Repo", "missing.txt": None}
+    
+    async def test_rest_fetch_reports_only_confirmed_missing(self, github_service):
+        """Test a 404 is reported as not-found and other failures are left out."""
+        repo = FakeRepository(
+            files={"README.md": "# Repo"},
+            contents={"flaky.txt": GithubException(502, {"message": "Bad Gateway"}, None)},
+        )
+        
+        texts = await github_service._get_files_rest(
+            repo, ["README.md", "missing.txt", "flaky.txt"]
+        )
+        
+        assert texts == {"README.md": "# Repo", "missing.txt": None}
+    
+    async def test_graphql_failure_falls_back_to_rest(self, github_service):
+        """Test dependency discovery fetches manifests over REST when GraphQL is rejected."""
+        repo = FakeRepository(
+            files={"requirements.txt": "fastapi==0.115.0\n"},
+            graphql_error=GithubException(401, {"message": "Requires authentication"}, None),
+        )
+        
+        dependencies = await github_service.discover_dependencies(
+            repo, tree_paths={"requirements.txt"}
+        )
+        
+        assert [dep.name for dep in dependencies] == ["fastapi"]
+        assert len(repo.requester.queries) == 1
+        assert repo.contents_requests == ["requirements.txt"]
+
+
+
+# =============================================================================
+# DEPENDENCY DISCOVERY TESTS
+# =============================================================================
+
+class TestDependencyDiscovery:
+    """Tests for manifest discovery and the file text cache it seeds."""
+    
+    async def test_only_manifests_in_tree_are_fetched(self, github_service):
+        """Test manifests absent from tree_paths are not requested."""
+        repo = FakeRepository(files={
+            "requirements.txt": "fastapi==0.115.0\n",
+            "package.json": '{"dependencies": {"react": "^18.2.0"}}',
+        })
+        
+        dependencies = await github_service.discover_dependencies(
+            repo, tree_paths={"requirements.txt", "package.json", "go.mod", "src/app.py"}
+        )
+        
+        assert sorted(dep.name for dep in dependencies) == ["fastapi", "react"]
+        (query,) = repo.requester.queries
+        fetched = {value.split(":", 1)[1] for alias, value in query.items() if alias.startswith("e")}
+        assert fetched == {"requirements.txt", "package.json", "go.mod"}
+    
+    async def test_fetched_manifests_served_to_get_file_content(self, github_service):
+        """Test cached manifests are reused, and a known-missing one still raises not-found."""
+        repo = FakeRepository(files={"requirements.txt": "fastapi==0.115.0\n"})
+        await github_service.discover_dependencies(repo, tree_paths={"requirements.txt", "go.mod"})
+        
+        assert github_service.get_file_content(repo, "requirements.txt", redact=False) == (
+            "fastapi==0.115.0\n", 0,
+        )
+        assert repo.contents_requests == []
+        
+        with pytest.raises(GithubException) as exc_info:
+            github_service.get_file_content(repo, "go.mod")
+        assert exc_info.value.status == 404
+
+
+# =============================================================================
+# CONCURRENCY TESTS
+# =============================================================================
+
+class SlowRepository(FakeRepository):
+    """FakeRepository whose contents requests take a while and record peak concurrency."""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+    
+    def get_contents(self, path, ref="main"):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            time.sleep(0.02)
+            return super().get_contents(path, ref)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TestConcurrency:
+    """Tests for coalesced repository lookups and bounded concurrent fetches."""
+    
+    async def test_concurrent_lookups_share_one_request(self, github_service):
+        """Test concurrent lookups of one repository make a single get_repo call."""
+        repo = FakeRepository()
+        get_repo_calls = []
+        
+        def get_repo(full_name):
+            get_repo_calls.append(full_name)
+            time.sleep(0.05)
+            return repo
+        
+        github_service.github = SimpleNamespace(get_repo=get_repo)
+        
+        results = await asyncio.gather(*(
+            github_service.get_repository_async("https://github.com/owner/repo")
+            for _ in range(8)
+        ))
+        
+        assert all(result is repo for result in results)
+        assert get_repo_calls == ["owner/repo"]
+    
+    async def test_rest_fetches_bounded_by_concurrency_limit(self, github_service):
+        """Test the REST fallback runs at most LIST_FILES_CONCURRENCY requests at once."""
+        github_service.LIST_FILES_CONCURRENCY = 2
+        paths = [f"file{i}.txt" for i in range(6)]
+        repo = SlowRepository(files={path: path for path in paths})
+        
+        texts = await github_service._get_files_rest(repo, paths)
+        
+        assert texts == {path: path for path in paths}
+        assert repo.peak_in_flight == 2
@@ -0,0 +1,40 @@
+# Copyright (c) Microsoft. All rights reserved.
+"""
+Unit tests for the state schemas.
+"""
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from src.schemas import FileInfo, RepoBundle
+
+
+# =============================================================================
+# FILE INFO TESTS
+# =============================================================================
+
+class TestFileInfo:
+    """Tests for FileInfo construction and serialization."""
+    
+    def test_hex_checksum_round_trips_through_bundle_json(self):
+        """Test a hex checksum is stored as bytes and dumped back as hex."""
+        sha = "3b18e512dba79e4c8300dd08aeb37f8e728b8dad"
+        file_info = FileInfo(path="src/main.py", checksum=sha)
+        
+        assert file_info.checksum == bytes.fromhex(sha)
+        
+        bundle = RepoBundle(
+            repo_url="https://github.com/microsoft/sample-repo",
+            ref="main",
+            files=[file_info],
+        )
+        data = json.loads(bundle.model_dump_json())
+        
+        assert data["files"][0]["checksum"] == sha
+    
+    def test_invalid_field_types_rejected(self):
+        """Test FileInfo validates its fields on construction."""
+        with pytest.raises(ValidationError):
+            FileInfo(path="src/main.py", size_bytes="big")